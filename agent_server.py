@@ -2,89 +2,186 @@
 
 from __future__ import annotations
 
+import functools
+import itertools
+import json
 import os
-import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from importlib import import_module
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
-from flask import Flask, abort, jsonify, render_template, request, send_file, url_for
+from flask import Flask, abort, render_template, request, send_file, url_for
+
+try:  # orjson is optional; it only speeds up the JSON endpoints.
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - falls back to the stdlib encoder.
+    orjson = None
 
 from speak_agent import (
-    VOICE_ASSIGNMENTS,
     clear_voice_assignment,
     get_or_assign_voice,
     mark_voice_unusable,
 )
 from tts_voice import speak as tts_provider
 
-INWORLD_TTS = import_module("tts_voice.speak")
+INWORLD_TTS = import_module("tts_voice.inworld")
+# Read once: the provider module has already loaded .env and the token won't change mid-process.
+_HAS_INWORLD_TOKEN = bool(os.getenv("INWORLD_API_TOKEN"))
+INWORLD_VOICES_TTL = 60.0
+_INWORLD_VOICES_CACHE: Optional[Tuple[float, List[str]]] = None
 
-ALLOWED_IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".webp"}
+ALLOWED_IMAGE_EXTENSIONS = frozenset({".png", ".jpg", ".jpeg", ".gif", ".webp"})
 IMAGE_DIR = Path(os.path.expanduser("~/Downloads/rand"))
 IMAGE_ASSIGNMENTS: Dict[str, Path] = {}
+# url_for("agent_image", ...) results, built once per agent id.
+IMAGE_URLS: Dict[str, str] = {}
+# Snapshot of IMAGE_ASSIGNMENTS.values(), refreshed whenever an assignment is written.
+_ASSIGNED_IMAGES: frozenset = frozenset()
 AGENT_STATES: Dict[str, Dict[str, str]] = {}
 LAST_AGENT_ID: Optional[str] = None
 STATE_VERSION: int = 0
+IMAGE_MAX_AGE = 3600
+
+# Playback for /api/speak runs here so the request returns as soon as the turn is
+# registered. A single worker keeps clips in arrival order on the one audio output.
+TTS_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts")
+# next() on a count is atomic under the GIL, so concurrent speaks never share a version.
+_STATE_COUNTER = itertools.count(1)
+# Spreads agents across images round-robin once every image is already taken.
+_FALLBACK_COUNTER = itertools.count()
+
+# Directory listing cached against IMAGE_DIR's mtime as
+# (mtime_ns, paths, normalized stems, set of paths).
+_ImageListing = Tuple[int, List[Path], Dict[Path, str], frozenset]
+_IMAGE_CACHE: Optional[_ImageListing] = None
+_IMAGE_CACHE_LOCK = threading.Lock()
 
 app = Flask(__name__)
+if not app.debug:
+    # Outside development the template never changes, so skip Jinja's per-render mtime check.
+    app.config["TEMPLATES_AUTO_RELOAD"] = False
+    app.jinja_env.auto_reload = False
+# Compile the page template at import so the first render doesn't pay for it.
+app.jinja_env.get_template("agent.html")
 
 
-def _list_image_files() -> List[Path]:
-    if not IMAGE_DIR.exists():
-        raise RuntimeError(f"Image directory not found: {IMAGE_DIR}")
+def _load_image_listing() -> _ImageListing:
+    global _IMAGE_CACHE
 
-    files = [p for p in IMAGE_DIR.iterdir() if p.suffix.lower() in ALLOWED_IMAGE_EXTENSIONS and p.is_file()]
-    if not files:
+    try:
+        mtime_ns = IMAGE_DIR.stat().st_mtime_ns
+    except FileNotFoundError:
+        raise RuntimeError(f"Image directory not found: {IMAGE_DIR}") from None
+
+    with _IMAGE_CACHE_LOCK:
+        cached = _IMAGE_CACHE
+        if cached is None or cached[0] != mtime_ns:
+            files: List[Path] = []
+            # scandir exposes the dirent type, so is_file() needs no extra stat.
+            with os.scandir(IMAGE_DIR) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if name[0] == ".":
+                        continue
+                    dot = name.rfind(".")
+                    if dot > 0 and name[dot:].lower() in ALLOWED_IMAGE_EXTENSIONS and entry.is_file():
+                        files.append(Path(entry.path))
+            files.sort(key=lambda p: p.name.lower())
+            cached = (mtime_ns, files, {path: _normalize(path.stem) for path in files}, frozenset(files))
+            _IMAGE_CACHE = cached
+
+    if not cached[1]:
         raise RuntimeError(f"No image files found in {IMAGE_DIR}")
-    return files
+    return cached
+
+
+def _list_image_files() -> List[Path]:
+    return _load_image_listing()[1]
+
+
+def _live_image_set() -> frozenset:
+    """Return the image paths currently present in IMAGE_DIR, without per-path stats."""
+    return _load_image_listing()[3]
+
+
+def _json_response(payload: Dict[str, object], status: int = 200):
+    if orjson is not None:
+        body = orjson.dumps(payload)
+    else:
+        body = json.dumps(payload, separators=(",", ":"))
+    return app.response_class(body, status=status, mimetype="application/json")
+
+
+def _invalidate_image_cache() -> None:
+    """Drop the cached directory listing so the next lookup rescans IMAGE_DIR."""
+    global _IMAGE_CACHE
+
+    with _IMAGE_CACHE_LOCK:
+        _IMAGE_CACHE = None
 
 
 def get_or_assign_image(agent_id: str) -> Path:
+    global _ASSIGNED_IMAGES
+
+    _, available, stems, live = _load_image_listing()
     assigned = IMAGE_ASSIGNMENTS.get(agent_id)
-    if assigned and assigned.exists():
+    if assigned and assigned in live:
         return assigned
 
-    available = _list_image_files()
-    existing = {path for path in IMAGE_ASSIGNMENTS.values() if path.exists()}
-
+    existing = _ASSIGNED_IMAGES
     normalized = _normalize(agent_id)
 
-    def _score(path: Path) -> int:
-        stem = _normalize(path.stem)
-        if stem == normalized:
-            return 3
-        if normalized and normalized in stem:
-            return 2
-        return 1
-
     # Prefer images whose filename matches the agent id; avoid using files already
-    # assigned to other agents unless there is an exact match.
-    candidates = sorted(available, key=lambda p: (-_score(p), p.name.lower()))
+    # assigned to other agents unless there is an exact match. The listing is sorted
+    # by lowercase name, so the first candidate seen at each score wins ties.
     image_path: Optional[Path] = None
-    for candidate in candidates:
-        if candidate in existing and _score(candidate) < 3:
+    best_substr: Optional[Path] = None
+    first_any: Optional[Path] = None
+    for candidate in available:
+        stem = stems[candidate]
+        if stem == normalized:
+            image_path = candidate
+            break
+        if candidate in existing:
             continue
-        image_path = candidate
-        break
+        if normalized and normalized in stem:
+            if best_substr is None:
+                best_substr = candidate
+        elif first_any is None:
+            first_any = candidate
 
     if image_path is None:
-        image_path = random.choice(available)
+        image_path = best_substr or first_any
+    if image_path is None:
+        image_path = available[next(_FALLBACK_COUNTER) % len(available)]
 
     IMAGE_ASSIGNMENTS[agent_id] = image_path
+    _ASSIGNED_IMAGES = frozenset(IMAGE_ASSIGNMENTS.values())
     return image_path
 
 
+@functools.lru_cache(maxsize=4096)
 def _normalize(value: str) -> str:
     return value.lower().replace(" ", "").replace("_", "")
 
 
 def _update_agent_state(agent_id: str, text: str, voice_id: str) -> None:
-    global LAST_AGENT_ID
+    """Record the agent's latest turn and bump STATE_VERSION so pollers see it.
+
+    Also called from the TTS_POOL worker when a fallback voice replaces the
+    registered one.
+    """
+    global LAST_AGENT_ID, STATE_VERSION
 
-    VOICE_ASSIGNMENTS[agent_id] = voice_id
+    # Voices from get_or_assign_voice are already recorded in VOICE_ASSIGNMENTS. The
+    # "inworld:<id>" fallback voice is deliberately not: it is not a voice of the
+    # active provider, so it only lives in AGENT_STATES.
     AGENT_STATES[agent_id] = {"text": text, "voice_id": voice_id}
     LAST_AGENT_ID = agent_id
+    STATE_VERSION = next(_STATE_COUNTER)
 
 
 @app.route("/")
@@ -119,10 +216,13 @@ def index():
 @app.route("/agent_image/<agent_id>")
 def agent_image(agent_id: str):
     image_path = get_or_assign_image(agent_id)
-    if not image_path or not image_path.exists():
+    if not image_path or image_path not in _live_image_set():
         abort(404)
 
-    return send_file(image_path)
+    # Let browsers revalidate the avatar with a 304 instead of re-downloading it on every poll.
+    response = send_file(image_path, conditional=True, etag=True, max_age=IMAGE_MAX_AGE)
+    response.headers["Cache-Control"] = f"public, max-age={IMAGE_MAX_AGE}, must-revalidate"
+    return response
 
 
 @app.post("/api/speak")
@@ -135,46 +235,61 @@ def api_speak():
         abort(400, description="JSON body must include 'agent_id' and 'text'.")
 
     try:
-        voice_id = handle_speech(agent_id, text)
+        voice_id = register_speech(agent_id, text)
     except Exception as exc:  # pragma: no cover - integration failure
         abort(500, description=str(exc))
 
-    return jsonify({
-        "status": "ok",
+    TTS_POOL.submit(_speak_in_background, agent_id, text, voice_id)
+
+    return _json_response({
+        "status": "queued",
         "agent_id": agent_id,
-    })
+        "state_version": STATE_VERSION,
+    }, status=202)
 
 
 def build_participant_context(active_query_agent: Optional[str]) -> Dict[str, object]:
+    try:
+        live = _live_image_set()
+    except RuntimeError:
+        live = frozenset()
+
+    active_id = (active_query_agent or "").strip() or LAST_AGENT_ID
+
     participants = []
-    for participant_id, path in IMAGE_ASSIGNMENTS.items():
-        if not path.exists():
+    active_idx: Optional[int] = None
+    first_text_idx: Optional[int] = None
+    for participant_id in sorted(IMAGE_ASSIGNMENTS):
+        if IMAGE_ASSIGNMENTS[participant_id] not in live:
             continue
         state = AGENT_STATES.get(participant_id, {})
+        text = state.get("text")
+        if text:
+            if participant_id == active_id:
+                active_idx = len(participants)
+            elif first_text_idx is None:
+                first_text_idx = len(participants)
+        image_url = IMAGE_URLS.get(participant_id)
+        if image_url is None:
+            image_url = IMAGE_URLS[participant_id] = url_for("agent_image", agent_id=participant_id)
         participants.append(
             {
                 "agent_id": participant_id,
                 "voice_id": state.get("voice_id"),
-                "text": state.get("text"),
-                "image_url": url_for("agent_image", agent_id=participant_id),
+                "text": text,
+                "image_url": image_url,
             }
         )
 
-    participants.sort(key=lambda item: item["agent_id"])
-
-    active_id = (active_query_agent or "").strip() or LAST_AGENT_ID
-
-    active_participant = None
-    if active_id:
-        active_participant = next(
-            (p for p in participants if p["agent_id"] == active_id and p.get("text")),
-            None,
-        )
-
-    if active_participant is None and participants:
-        active_participant = next((p for p in participants if p.get("text")), participants[0])
+    if active_idx is None:
+        active_idx = first_text_idx if first_text_idx is not None else (0 if participants else None)
 
-    other_participants = [p for p in participants if p is not active_participant]
+    if active_idx is None:
+        active_participant = None
+        other_participants = []
+    else:
+        active_participant = participants[active_idx]
+        other_participants = participants[:active_idx] + participants[active_idx + 1:]
 
     return {
         "participants": participants,
@@ -186,18 +301,44 @@ def build_participant_context(active_query_agent: Optional[str]) -> Dict[str, ob
 
 
 def handle_speech(agent_id: str, text: str) -> str:
+    voice_id = register_speech(agent_id, text)
+    return _do_tts(agent_id, text, voice_id)
+
+
+def register_speech(agent_id: str, text: str) -> str:
+    """Assign voice and image, record the turn, and bump the state version."""
     if not text:
         raise ValueError("Text must be non-empty")
 
     voice_id = get_or_assign_voice(agent_id)
     get_or_assign_image(agent_id)
     _update_agent_state(agent_id, text, voice_id)
+    return voice_id
 
+
+def _speak_in_background(agent_id: str, text: str, voice_id: str) -> None:
+    try:
+        _do_tts(agent_id, text, voice_id)
+    except Exception as exc:  # pragma: no cover - external TTS failure
+        print(f"[tts] Background playback failed for {agent_id}: {exc}")
+
+
+def _is_voice_rejection(exc: Exception) -> bool:
+    """True when the provider refused the request itself (e.g. an unknown voice id).
+
+    Timeouts, throttling, auth/quota errors and local playback failures are not
+    the voice's fault, so those only sideline it for this process.
+    """
+    status = getattr(getattr(exc, "response", None), "status_code", None)
+    return isinstance(status, int) and 400 <= status < 500 and status not in (401, 402, 403, 408, 429)
+
+
+def _do_tts(agent_id: str, text: str, voice_id: str) -> str:
     try:
         tts_provider.speak(text, voice_id)
     except Exception as exc:  # pragma: no cover - external TTS failure
         print(f"[tts] Playback failed for {agent_id}: {exc}")
-        mark_voice_unusable(voice_id)
+        mark_voice_unusable(voice_id, persist=_is_voice_rejection(exc))
         clear_voice_assignment(agent_id)
         fallback_voice = get_or_assign_voice(agent_id)
         fallback_success, fallback_voice = _attempt_elevenlabs_retry(agent_id, text, voice_id)
@@ -207,8 +348,6 @@ def handle_speech(agent_id: str, text: str) -> str:
                 voice_id = fallback_voice
                 _update_agent_state(agent_id, text, voice_id)
 
-    global STATE_VERSION
-    STATE_VERSION += 1
     return voice_id
 
 
@@ -230,18 +369,31 @@ def _attempt_elevenlabs_retry(agent_id: str, text: str, failed_voice: str) -> Tu
         return True, fallback_voice
     except Exception as retry_exc:  # pragma: no cover - secondary failure
         print(f"[tts] Retry failed for {agent_id}: {retry_exc}")
-        mark_voice_unusable(fallback_voice)
+        mark_voice_unusable(fallback_voice, persist=_is_voice_rejection(retry_exc))
         return False, None
 
 
+def _inworld_voices() -> List[str]:
+    """Return Inworld voices, refetching at most once per INWORLD_VOICES_TTL seconds."""
+    global _INWORLD_VOICES_CACHE
+
+    now = time.monotonic()
+    cached = _INWORLD_VOICES_CACHE
+    if cached is not None and now - cached[0] < INWORLD_VOICES_TTL:
+        return cached[1]
+
+    voices = INWORLD_TTS.fetch_available_voices()
+    _INWORLD_VOICES_CACHE = (now, voices)
+    return voices
+
+
 def _attempt_inworld_fallback(agent_id: str, text: str) -> Optional[str]:
-    token = os.getenv("INWORLD_API_TOKEN")
-    if not token:
+    if not _HAS_INWORLD_TOKEN:
         print("[tts] Inworld fallback skipped: missing INWORLD_API_TOKEN.")
         return None
 
     try:
-        voices = INWORLD_TTS.fetch_available_voices()
+        voices = _inworld_voices()
     except Exception as exc:  # pragma: no cover
         print(f"[tts] Inworld fallback failed to fetch voices: {exc}")
         return None
@@ -262,11 +414,13 @@ def _attempt_inworld_fallback(agent_id: str, text: str) -> Optional[str]:
 
 @app.get("/api/state_version")
 def api_state_version():
-    return jsonify({
+    return _json_response({
         "version": STATE_VERSION,
         "active_agent": LAST_AGENT_ID,
     })
 
 
 if __name__ == "__main__":
+    app.config["TEMPLATES_AUTO_RELOAD"] = True
+    app.jinja_env.auto_reload = True
     app.run(debug=True, port=5053)
@@ -6,10 +6,17 @@ import asyncio
 import importlib
 import json
 import os
+import sys
+import types
 from pathlib import Path
-from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
 
-import requests
+import aiohttp
+
+try:  # orjson is optional; it only speeds up history loading.
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - falls back to the stdlib decoder.
+    orjson = None
 
 from engine import (
     Agent,
@@ -20,13 +27,21 @@ from engine import (
     OpenAILLMClient,
     Persona,
     PromptSet,
+    RateLimiter,
     TemplateRenderer,
+    aclose_http_clients,
     load_personas,
     load_prompts,
 )
 
 TurnHook = Callable[[ConversationTurn, int], Awaitable[None]]
 
+# Shared read-only stand-in for a missing options mapping.
+_EMPTY: Mapping[str, Any] = types.MappingProxyType({})
+
+# Shared across turns so playback requests reuse a keep-alive connection.
+_SESSION: Optional[aiohttp.ClientSession] = None
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Run an async persona-driven banter session.")
@@ -45,6 +60,11 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--default-provider", default="openai", help="Fallback provider if persona lacks llm settings.")
     parser.add_argument("--default-model", default="gpt-4o-mini", help="Fallback model if persona lacks llm model.")
     parser.add_argument("--rounds", type=int, default=1, help="Number of rounds; each agent speaks once per round.")
+    parser.add_argument(
+        "--parallel-round",
+        action="store_true",
+        help="Generate every agent's turn in a round concurrently from the transcript as of the round start.",
+    )
     parser.add_argument(
         "--history",
         type=Path,
@@ -72,6 +92,18 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Output the conversation as JSON records instead of plain text.",
     )
+    parser.add_argument(
+        "--jsonl",
+        action="store_true",
+        help="Stream each turn as a JSON line as soon as it is produced.",
+    )
+    parser.add_argument(
+        "--pretty",
+        action="store_true",
+        help="Indent --json output for readability.",
+    )
+    parser.add_argument("--rpm", type=int, help="Requests-per-minute cap shared by personas using the same API key.")
+    parser.add_argument("--tpm", type=int, help="Estimated tokens-per-minute cap shared by personas using the same API key.")
     return parser.parse_args()
 
 
@@ -84,13 +116,13 @@ def build_agent(
     llm_display: str,
     base_parameters: Dict[str, Any],
 ) -> Agent:
-    parameters = {key: value for key, value in base_parameters.items()}
+    parameters = dict(base_parameters)
     voice = persona.style.get("voice") if isinstance(persona.style, dict) else None
     if isinstance(voice, str) and voice:
-        style_cfg = parameters.setdefault("style", {}) if isinstance(parameters, dict) else {}
-        if isinstance(style_cfg, dict):
-            style_cfg.setdefault("voice", voice)
-            parameters["style"] = style_cfg
+        style_cfg = parameters.get("style")
+        if not isinstance(style_cfg, dict):
+            style_cfg = parameters["style"] = {}
+        style_cfg.setdefault("voice", voice)
     return Agent(
         key=key,
         persona=persona,
@@ -103,23 +135,22 @@ def build_agent(
 
 
 def load_history(path: Path) -> List[ConversationTurn]:
-    with path.open("r", encoding="utf-8") as handle:
-        raw = json.load(handle)
+    data = path.read_bytes()
+    raw = orjson.loads(data) if orjson is not None else json.loads(data)
     if not isinstance(raw, list):  # pragma: no cover - defensive path.
         raise ValueError("History JSON must be a list of objects")
-    turns: List[ConversationTurn] = []
-    for entry in raw:
-        if not isinstance(entry, dict) or "speaker" not in entry or "text" not in entry:
-            raise ValueError("History entries must be objects with 'speaker' and 'text'")
-        turns.append(
+    try:
+        return [
             ConversationTurn(
                 speaker=entry["speaker"],
                 text=entry["text"],
                 llm_display=entry.get("llm_display", ""),
                 parameters=entry.get("parameters", {}),
             )
-        )
-    return turns
+            for entry in raw
+        ]
+    except (KeyError, TypeError, AttributeError):
+        raise ValueError("History entries must be objects with 'speaker' and 'text'") from None
 
 
 def resolve_hook(path: Optional[str]) -> Optional[TurnHook]:
@@ -162,13 +193,21 @@ def get_api_key(provider: str, config: Dict[str, Any], persona_key: str) -> Tupl
     return api_key, api_key_env
 
 
+def _dict_or_empty(value: Any) -> Mapping[str, Any]:
+    return value if isinstance(value, dict) else _EMPTY
+
+
 def build_llm_clients(
     persona_map: Dict[str, Persona],
     selected_keys: Tuple[str, ...],
     default_provider: str,
     default_model: str,
+    rpm: Optional[int] = None,
+    tpm: Optional[int] = None,
 ) -> Dict[str, Tuple[object, str, Dict[str, Any]]]:
     cache: Dict[Tuple[str, str, str], object] = {}
+    # Rate limits are per account, so clients sharing credentials share a limiter.
+    limiters: Dict[Tuple[str, str], RateLimiter] = {}
     resolved: Dict[str, Tuple[object, str, Dict[str, Any]]] = {}
 
     for key in selected_keys:
@@ -179,19 +218,36 @@ def build_llm_clients(
         if not model:
             raise SystemExit(f"Persona {key} needs an llm.model or specify --default-model")
 
-        api_key, cache_env = get_api_key(provider, config, key)
-        client_options = config.get("client_options")
-        if not isinstance(client_options, dict):
-            client_options = {}
-        cache_identifier = cache_env or f"key:{hash(api_key)}"
-        cache_key = (provider, model, cache_identifier)
+        api_key, _ = get_api_key(provider, config, key)
+        client_options = _dict_or_empty(config.get("client_options"))
+        # Keyed on the key itself: personas sharing credentials share a client no matter
+        # which env var supplied them, and distinct keys can never collide.
+        cache_key = (provider, model, api_key)
         if cache_key not in cache:
+            limiter = None
+            if rpm or tpm:
+                limiter = limiters.setdefault((provider, api_key), RateLimiter(rpm=rpm, tpm=tpm))
             if provider == "openai":
-                cache[cache_key] = OpenAILLMClient(model=model, api_key=api_key, default_options=client_options)
+                cache[cache_key] = OpenAILLMClient(
+                    model=model,
+                    api_key=api_key,
+                    default_options=client_options,
+                    rate_limiter=limiter,
+                )
             elif provider == "gemini":
-                cache[cache_key] = GeminiLLMClient(model=model, api_key=api_key, client_options=client_options)
+                cache[cache_key] = GeminiLLMClient(
+                    model=model,
+                    api_key=api_key,
+                    client_options=client_options,
+                    rate_limiter=limiter,
+                )
             elif provider == "grok":
-                cache[cache_key] = GrokLLMClient(model=model, api_key=api_key, client_options=client_options)
+                cache[cache_key] = GrokLLMClient(
+                    model=model,
+                    api_key=api_key,
+                    client_options=client_options,
+                    rate_limiter=limiter,
+                )
             else:
                 raise SystemExit(f"Unsupported LLM provider '{provider}' for persona {key}")
         display = config.get("display")
@@ -221,7 +277,14 @@ async def run_async(args: argparse.Namespace) -> None:
     renderer = TemplateRenderer()
 
     selected_keys = tuple(args.agents)
-    llm_map = build_llm_clients(personas, selected_keys, args.default_provider, args.default_model)
+    llm_map = build_llm_clients(
+        personas,
+        selected_keys,
+        args.default_provider,
+        args.default_model,
+        rpm=args.rpm,
+        tpm=args.tpm,
+    )
 
     agents = [
         build_agent(key, personas[key], llm_map[key][0], prompts, renderer, llm_map[key][1], llm_map[key][2])
@@ -230,26 +293,41 @@ async def run_async(args: argparse.Namespace) -> None:
 
     conversation = Conversation(topic=args.topic)
     records: List[Dict[str, Any]] = []
+    plain_text = not (args.json or args.jsonl)
+
+    def emit(record: Dict[str, Any]) -> None:
+        if args.jsonl:
+            sys.stdout.write(json.dumps(record, separators=(",", ":")) + "\n")
+            sys.stdout.flush()
+        else:
+            records.append(record)
+
+    # Resolved once so the per-turn path is a plain dict lookup.
+    label_for = {
+        key: persona.llm.get("display") or persona.llm.get("provider", "")
+        for key, persona in personas.items()
+    }
+    default_params_for = {key: llm_map[key][2] for key in selected_keys}
 
     if args.history:
         history_turns = load_history(args.history)
         conversation.turns.extend(history_turns)
         if history_turns:
             for turn in history_turns:
-                label = turn.llm_display or personas[turn.speaker].llm.get("display") or personas[turn.speaker].llm.get("provider", "")
+                label = turn.llm_display or label_for[turn.speaker]
                 persona_name = personas[turn.speaker].name
                 record = {
                     "agent": turn.speaker,
                     "agent_name": persona_name,
                     "llm": label,
                     "text": turn.text,
-                    "parameters": turn.parameters or llm_map.get(turn.speaker, (None, label, {}))[2],
+                    "parameters": turn.parameters or default_params_for.get(turn.speaker, {}),
                 }
-                records.append(record)
-                if not args.json:
+                emit(record)
+                if plain_text:
                     suffix = f" ({label})" if label else ""
                     print(f"- {persona_name} - {turn.speaker}{suffix}: {turn.text}")
-            if not args.json:
+            if plain_text:
                 print("\nContinuing conversation...\n")
 
     hook = resolve_hook(args.hook)
@@ -258,14 +336,19 @@ async def run_async(args: argparse.Namespace) -> None:
     if flask_url.lower() == "none":
         flask_url = ""
 
+    # Playback for a turn runs in the background while the next agent generates;
+    # it is awaited before the following turn is sent so audio stays in order.
+    pending_playback: Optional[asyncio.Task[None]] = None
+
     for round_index in range(args.rounds):
-        for agent in agents:
-            turn = await conversation.astep(
-                agent,
-                round_rule=args.round_rule,
-                length_limit=args.length_limit,
-            )
-            label = turn.llm_display or personas[turn.speaker].llm.get("display") or personas[turn.speaker].llm.get("provider", "")
+        async for turn in round_turns(
+            conversation,
+            agents,
+            round_rule=args.round_rule,
+            length_limit=args.length_limit,
+            parallel=args.parallel_round,
+        ):
+            label = turn.llm_display or label_for[turn.speaker]
             suffix = f" ({label})" if label else ""
             persona_name = personas[turn.speaker].name
             record = {
@@ -273,24 +356,33 @@ async def run_async(args: argparse.Namespace) -> None:
                 "agent_name": persona_name,
                 "llm": label,
                 "text": turn.text,
-                "parameters": turn.parameters or llm_map[turn.speaker][2],
+                "parameters": turn.parameters or default_params_for[turn.speaker],
             }
-            records.append(record)
-            if not args.json:
+            emit(record)
+            if plain_text:
                 print(f"[{round_index + 1}] {persona_name} - {turn.speaker}{suffix}: {turn.text}\n")
 
             if hook is not None:
                 await hook(turn, round_index)
 
-            if flask_url:
-                await broadcast_to_flask(flask_url, turn)
+            if pending_playback is not None:
+                await pending_playback
+                pending_playback = None
 
-            if args.delay > 0:
-                await asyncio.sleep(args.delay)
+            if flask_url or args.delay > 0:
+                pending_playback = asyncio.create_task(play_turn(flask_url, turn, args.delay))
 
-    if args.json:
-        print(json.dumps(records, indent=2))
-    else:
+    if pending_playback is not None:
+        await pending_playback
+
+    if args.jsonl:
+        pass  # Records were already streamed as they were produced.
+    elif args.json:
+        if args.pretty:
+            print(json.dumps(records, indent=2))
+        else:
+            print(json.dumps(records, separators=(",", ":")))
+    elif plain_text:
         print("Conversation complete. Final transcript:")
         for record in records:
             label = record["llm"]
@@ -298,6 +390,43 @@ async def run_async(args: argparse.Namespace) -> None:
             print(f"- {record['agent_name']} - {record['agent']}{suffix}: {record['text']}")
 
 
+async def round_turns(
+    conversation: Conversation,
+    agents: Sequence[Agent],
+    *,
+    round_rule: Optional[str],
+    length_limit: Optional[int],
+    parallel: bool,
+) -> AsyncIterator[ConversationTurn]:
+    """Yield one round of turns in agent order, appending each to the transcript.
+
+    In parallel mode every agent sees the transcript as it stood when the round
+    began; the LLM calls overlap and the turns are committed in agent order.
+    """
+
+    if not parallel:
+        for agent in agents:
+            yield await conversation.astep(agent, round_rule=round_rule, length_limit=length_limit)
+        return
+
+    for turn in await conversation.astep_many(agents, round_rule=round_rule, length_limit=length_limit):
+        yield turn
+
+
+async def _get_session() -> aiohttp.ClientSession:
+    global _SESSION
+    if _SESSION is None or _SESSION.closed:
+        _SESSION = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=8, keepalive_timeout=60))
+    return _SESSION
+
+
+async def _close_session() -> None:
+    global _SESSION
+    if _SESSION is not None:
+        await _SESSION.close()
+        _SESSION = None
+
+
 async def broadcast_to_flask(base_url: str, turn: ConversationTurn) -> None:
     """Send the current turn to the Flask playback server."""
 
@@ -308,19 +437,34 @@ async def broadcast_to_flask(base_url: str, turn: ConversationTurn) -> None:
     payload = {"agent_id": agent_id, "text": turn.text}
     endpoint = base_url.rstrip("/") + "/api/speak"
 
-    def _request() -> None:
-        try:
-            response = requests.post(endpoint, json=payload, timeout=120)
+    try:
+        session = await _get_session()
+        async with session.post(endpoint, json=payload, timeout=aiohttp.ClientTimeout(total=120)) as response:
             response.raise_for_status()
-        except Exception as exc:  # pragma: no cover - best effort side effect.
-            print(f"[flask] Failed to trigger playback for {agent_id}: {exc}")
+    except Exception as exc:  # pragma: no cover - best effort side effect.
+        print(f"[flask] Failed to trigger playback for {agent_id}: {exc}")
+
+
+async def play_turn(flask_url: str, turn: ConversationTurn, delay: float) -> None:
+    """Broadcast a turn for playback, then hold for the configured delay."""
+
+    if flask_url:
+        await broadcast_to_flask(flask_url, turn)
+    if delay > 0:
+        await asyncio.sleep(delay)
+
 
-    await asyncio.to_thread(_request)
+async def _run_and_cleanup(args: argparse.Namespace) -> None:
+    try:
+        await run_async(args)
+    finally:
+        await _close_session()
+        await aclose_http_clients()
 
 
 def main() -> None:
     args = parse_args()
-    asyncio.run(run_async(args))
+    asyncio.run(_run_and_cleanup(args))
 
 
 if __name__ == "__main__":
@@ -2,20 +2,30 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
 import json
 import os
+import sys
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
+
+try:  # orjson is optional; it only speeds up --json output.
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - falls back to the stdlib encoder.
+    orjson = None
 
 from engine import (
     Agent,
     Conversation,
+    ConversationTurn,
     GeminiLLMClient,
     GrokLLMClient,
     OpenAILLMClient,
     Persona,
     PromptSet,
+    RateLimiter,
     TemplateRenderer,
+    aclose_http_clients,
     load_personas,
     load_prompts,
 )
@@ -50,6 +60,13 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Output the conversation as JSON records instead of plain text.",
     )
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="Request every agent's reply concurrently; each sees only the topic, not the others' replies.",
+    )
+    parser.add_argument("--rpm", type=int, help="Requests-per-minute cap shared by personas using the same API key.")
+    parser.add_argument("--tpm", type=int, help="Estimated tokens-per-minute cap shared by personas using the same API key.")
     return parser.parse_args()
 
 
@@ -60,15 +77,9 @@ def build_agent(
     prompts: PromptSet,
     renderer: TemplateRenderer,
     llm_display: str,
-    base_parameters: Dict[str, Any],
+    parameters: Dict[str, Any],
 ) -> Agent:
-    parameters = {key: value for key, value in base_parameters.items()}
-    voice = persona.style.get("voice") if isinstance(persona.style, dict) else None
-    if isinstance(voice, str) and voice:
-        style_cfg = parameters.setdefault("style", {}) if isinstance(parameters, dict) else {}
-        if isinstance(style_cfg, dict):
-            style_cfg.setdefault("voice", voice)
-            parameters["style"] = style_cfg
+    """Wrap a persona in an Agent; ``parameters`` comes prebuilt from build_llm_clients."""
     return Agent(
         key=key,
         persona=persona,
@@ -110,8 +121,12 @@ def build_llm_clients(
     selected_keys: Tuple[str, ...],
     default_provider: str,
     default_model: str,
+    rpm: Optional[int] = None,
+    tpm: Optional[int] = None,
 ) -> Dict[str, Tuple[object, str, Dict[str, Any]]]:
     cache: Dict[Tuple[str, str, str], object] = {}
+    # Rate limits are per account, so clients sharing credentials share a limiter.
+    limiters: Dict[Tuple[str, str], RateLimiter] = {}
     resolved: Dict[str, Tuple[object, str, Dict[str, Any]]] = {}
 
     for key in selected_keys:
@@ -122,24 +137,44 @@ def build_llm_clients(
         if not model:
             raise SystemExit(f"Persona {key} needs an llm.model or specify --default-model")
 
-        api_key, cache_env = get_api_key(provider, config, key)
+        api_key, _ = get_api_key(provider, config, key)
         client_options = config.get("client_options")
         if not isinstance(client_options, dict):
             client_options = {}
-        cache_identifier = cache_env or f"key:{hash(api_key)}"
-        cache_key = (provider, model, cache_identifier)
+        # Keyed on the key itself: personas sharing credentials share a client no matter
+        # which env var supplied them, and distinct keys can never collide.
+        cache_key = (provider, model, api_key)
         if cache_key not in cache:
+            limiter = None
+            if rpm or tpm:
+                limiter = limiters.setdefault((provider, api_key), RateLimiter(rpm=rpm, tpm=tpm))
             if provider == "openai":
-                cache[cache_key] = OpenAILLMClient(model=model, api_key=api_key, default_options=client_options)
+                cache[cache_key] = OpenAILLMClient(
+                    model=model,
+                    api_key=api_key,
+                    default_options=client_options,
+                    rate_limiter=limiter,
+                )
             elif provider == "gemini":
-                cache[cache_key] = GeminiLLMClient(model=model, api_key=api_key, client_options=client_options)
+                cache[cache_key] = GeminiLLMClient(
+                    model=model,
+                    api_key=api_key,
+                    client_options=client_options,
+                    rate_limiter=limiter,
+                )
             elif provider == "grok":
-                cache[cache_key] = GrokLLMClient(model=model, api_key=api_key, client_options=client_options)
+                cache[cache_key] = GrokLLMClient(
+                    model=model,
+                    api_key=api_key,
+                    client_options=client_options,
+                    rate_limiter=limiter,
+                )
             else:
                 raise SystemExit(f"Unsupported LLM provider '{provider}' for persona {key}")
         display = config.get("display")
         if not isinstance(display, str) or not display:
             display = provider
+        # Handed to the agent (and every turn it produces) by reference; treat as read-only.
         params: Dict[str, Any] = {}
         voice = persona.style.get("voice") if isinstance(persona.style, dict) else None
         if isinstance(voice, str) and voice:
@@ -149,9 +184,7 @@ def build_llm_clients(
     return resolved
 
 
-def main() -> None:
-    args = parse_args()
-
+async def run_async(args: argparse.Namespace) -> None:
     root = Path(__file__).resolve().parent
     personas = load_personas(root / "codex" / "personas.yaml")
 
@@ -163,7 +196,14 @@ def main() -> None:
     renderer = TemplateRenderer()
 
     selected_keys = tuple(args.agents)
-    llm_map = build_llm_clients(personas, selected_keys, args.default_provider, args.default_model)
+    llm_map = build_llm_clients(
+        personas,
+        selected_keys,
+        args.default_provider,
+        args.default_model,
+        rpm=args.rpm,
+        tpm=args.tpm,
+    )
 
     agents = [
         build_agent(key, personas[key], llm_map[key][0], prompts, renderer, llm_map[key][1], llm_map[key][2])
@@ -173,11 +213,22 @@ def main() -> None:
     conversation = Conversation(topic=args.topic)
 
     records = []
-    for agent in agents:
-        turn = conversation.step(agent)
+    json_output = getattr(args, "json", False)
+    # Stream tokens to an interactive terminal; piped or JSON output gets whole turns.
+    stream_output = not json_output and not args.parallel and sys.stdout.isatty()
+
+    def speaker_line(speaker: str, llm_display: str) -> str:
+        label = llm_display or personas[speaker].llm.get("display") or personas[speaker].llm.get("provider", "")
+        suffix = f" ({label})" if label else ""
+        return f"{personas[speaker].name} - {speaker}{suffix}: "
+
+    def write_token(token: str) -> None:
+        sys.stdout.write(token)
+        sys.stdout.flush()
+
+    def report(turn: ConversationTurn, *, echo: bool = True) -> None:
         persona_name = personas[turn.speaker].name
         label = turn.llm_display or personas[turn.speaker].llm.get("display") or personas[turn.speaker].llm.get("provider", "")
-        suffix = f" ({label})" if label else ""
         record = {
             "agent": turn.speaker,
             "agent_name": persona_name,
@@ -186,11 +237,27 @@ def main() -> None:
             "parameters": turn.parameters or llm_map[turn.speaker][2],
         }
         records.append(record)
-        if not getattr(args, "json", False):
-            print(f"{persona_name} - {turn.speaker}{suffix}: {turn.text}\n")
+        if echo and not json_output:
+            print(f"{speaker_line(turn.speaker, turn.llm_display)}{turn.text}\n")
+
+    if args.parallel:
+        for turn in await conversation.astep_many(agents):
+            report(turn)
+    elif stream_output:
+        for agent in agents:
+            sys.stdout.write(speaker_line(agent.persona.key, agent.llm_display))
+            turn = await conversation.astream_step(agent, on_token=write_token)
+            sys.stdout.write("\n\n")
+            report(turn, echo=False)
+    else:
+        for agent in agents:
+            report(await conversation.astep(agent))
 
-    if getattr(args, "json", False):
-        print(json.dumps(records, indent=2))
+    if json_output:
+        if orjson is not None:
+            sys.stdout.buffer.write(orjson.dumps(records, option=orjson.OPT_INDENT_2) + b"\n")
+        else:
+            print(json.dumps(records, indent=2))
     else:
         print("Full history:")
         for record in records:
@@ -199,5 +266,17 @@ def main() -> None:
             print(f"- {record['agent_name']} - {record['agent']}{suffix}: {record['text']}")
 
 
+async def _run_and_cleanup(args: argparse.Namespace) -> None:
+    try:
+        await run_async(args)
+    finally:
+        await aclose_http_clients()
+
+
+def main() -> None:
+    args = parse_args()
+    asyncio.run(_run_and_cleanup(args))
+
+
 if __name__ == "__main__":
     main()
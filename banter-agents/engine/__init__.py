@@ -3,29 +3,45 @@
 from .simulation import (
     Persona,
     Agent,
+    CompiledTemplate,
     Conversation,
     ConversationTurn,
     LLMClient,
     PromptSet,
     TemplateRenderer,
     SupportsAComplete,
+    SupportsAStream,
     load_personas,
     load_prompts,
+    run_conversations,
+)
+from .clients import (
+    OpenAILLMClient,
+    GeminiLLMClient,
+    GrokLLMClient,
+    RateLimiter,
+    ResponseCache,
+    aclose_http_clients,
 )
-from .clients import OpenAILLMClient, GeminiLLMClient, GrokLLMClient
 
 __all__ = [
     "Persona",
     "Agent",
+    "CompiledTemplate",
     "Conversation",
     "ConversationTurn",
     "LLMClient",
     "PromptSet",
     "TemplateRenderer",
     "SupportsAComplete",
+    "SupportsAStream",
     "load_personas",
     "load_prompts",
+    "run_conversations",
     "OpenAILLMClient",
     "GeminiLLMClient",
     "GrokLLMClient",
+    "RateLimiter",
+    "ResponseCache",
+    "aclose_http_clients",
 ]
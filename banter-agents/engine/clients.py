@@ -1,10 +1,418 @@
 """LLM client implementations for the banter agent engine."""
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Sequence
+import asyncio
+import atexit
+import functools
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import random
+import time
+import types
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Iterator, List, Mapping, Optional, Sequence, Set, Tuple, TypeVar
 
 from .simulation import LLMClient
 
+try:  # orjson is optional; it speeds up request/response bodies for the REST adapters.
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - falls back to the stdlib codec.
+    orjson = None
+
+# (sync, async) httpx clients per (provider, api_key) so personas sharing credentials share a pool.
+_HTTP_CLIENTS: Dict[Tuple[str, str], Tuple[Any, Any]] = {}
+# Sized for dataset-scale batch runs rather than httpx's defaults.
+HTTP_MAX_CONNECTIONS = 200
+HTTP_MAX_KEEPALIVE = 100
+HTTP_CONNECT_TIMEOUT = 5.0
+HTTP_TIMEOUT = 30.0
+# The OpenAI SDK's own default: long non-streaming completions and file transfers need it.
+OPENAI_TIMEOUT = 600.0
+
+
+@functools.lru_cache(maxsize=None)
+def _openai_clients(api_key: Optional[str], organization: Optional[str]) -> Tuple[Any, Any]:
+    """Return (sync, async) OpenAI clients shared by every model using these credentials."""
+    try:
+        from openai import AsyncOpenAI, OpenAI
+    except ImportError as exc:  # pragma: no cover - surfaced at runtime for users.
+        raise RuntimeError(
+            "openai package is required for OpenAILLMClient."
+        ) from exc
+
+    # The SDK is built on httpx; hand it the same bounded pools the other adapters use.
+    http_client, async_http_client = _http_clients("openai", api_key or "", read_timeout=OPENAI_TIMEOUT)
+    return (
+        OpenAI(
+            api_key=api_key,
+            organization=organization,
+            http_client=http_client,
+            timeout=OPENAI_TIMEOUT,
+        ),
+        # Async calls retry through _async_retry, which respects the rate limiter, so the SDK's own retries are off.
+        AsyncOpenAI(
+            api_key=api_key,
+            organization=organization,
+            http_client=async_http_client,
+            timeout=OPENAI_TIMEOUT,
+            max_retries=0,
+        ),
+    )
+
+
+logger = logging.getLogger(__name__)
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def _dumps(payload: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode("utf-8")
+
+
+def _loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def estimate_tokens(messages: Sequence[Dict[str, str]]) -> int:
+    """Cheap prompt-size estimate (~4 characters per token) for rate limiting."""
+    return sum(len(message.get("content") or "") for message in messages) // 4 + 4 * len(messages)
+
+
+class RateLimiter:
+    """Sliding 60-second window over requests (RPM) and estimated tokens (TPM).
+
+    Share one instance between every client that draws on the same account quota.
+    ``acquire`` sleeps just long enough for the window to admit the next request.
+    """
+
+    WINDOW = 60.0
+
+    def __init__(self, rpm: Optional[int] = None, tpm: Optional[int] = None) -> None:
+        self._rpm = rpm
+        self._tpm = tpm
+        self._events: Deque[Tuple[float, int]] = deque()
+        self._tokens = 0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, est_tokens: int = 0) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                while self._events and now - self._events[0][0] >= self.WINDOW:
+                    self._tokens -= self._events.popleft()[1]
+                wait = self._wait_time(now, est_tokens)
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            self._events.append((now, est_tokens))
+            self._tokens += est_tokens
+
+    def _wait_time(self, now: float, est_tokens: int) -> float:
+        if self._rpm and len(self._events) >= self._rpm:
+            return self._events[0][0] + self.WINDOW - now
+        if self._tpm and self._events and self._tokens + est_tokens > self._tpm:
+            # Wait for the oldest requests whose tokens free enough budget to expire.
+            # A request larger than the whole budget waits for an empty window instead.
+            needed = self._tokens + est_tokens - self._tpm
+            freed = 0
+            for stamp, tokens in self._events:
+                freed += tokens
+                if freed >= needed:
+                    return stamp + self.WINDOW - now
+            return self._events[-1][0] + self.WINDOW - now
+        return 0.0
+
+
+class ResponseCache:
+    """Exact-match on-disk cache of completions, for replaying identical demo runs."""
+
+    def __init__(self, directory: Optional[str] = None, *, expire: int = 86400) -> None:
+        try:
+            import diskcache
+        except ImportError as exc:  # pragma: no cover - surfaced only when caching is enabled.
+            raise RuntimeError(
+                "diskcache package is required when BANTER_CACHE=1. Install it via `pip install diskcache`."
+            ) from exc
+
+        self._cache = diskcache.Cache(directory or os.path.expanduser("~/.cache/banter-agents"))
+        self._expire = expire
+
+    @staticmethod
+    def key(scope: Any, messages: Sequence[Dict[str, str]], options: Dict[str, Any]) -> str:
+        blob = json.dumps(
+            {"scope": scope, "messages": list(messages), "opts": options},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        return self._cache.get(key)
+
+    def set(self, key: str, text: str) -> None:
+        self._cache.set(key, text, expire=self._expire)
+
+
+@functools.lru_cache(maxsize=1)
+def _response_cache() -> Optional[ResponseCache]:
+    """Return the shared response cache when BANTER_CACHE=1, otherwise None."""
+    if os.getenv("BANTER_CACHE") != "1":
+        return None
+    return ResponseCache()
+
+
+def _response_cached(method: _F) -> _F:
+    """Serve ``complete``/``acomplete`` from the response cache when it is enabled.
+
+    The key covers the client's ``_cache_scope`` (provider, model, configured
+    defaults), the messages, and the per-call options.
+    """
+
+    if asyncio.iscoroutinefunction(method):
+
+        @functools.wraps(method)
+        async def async_wrapper(self: Any, messages: Sequence[Dict[str, str]], **kwargs: Any) -> str:
+            cache = _response_cache()
+            if cache is None:
+                return await method(self, messages, **kwargs)
+            key = cache.key(self._cache_scope, messages, kwargs)
+            hit = cache.get(key)
+            if hit is not None:
+                return hit
+            text = await method(self, messages, **kwargs)
+            cache.set(key, text)
+            return text
+
+        return async_wrapper  # type: ignore[return-value]
+
+    @functools.wraps(method)
+    def wrapper(self: Any, messages: Sequence[Dict[str, str]], **kwargs: Any) -> str:
+        cache = _response_cache()
+        if cache is None:
+            return method(self, messages, **kwargs)
+        key = cache.key(self._cache_scope, messages, kwargs)
+        hit = cache.get(key)
+        if hit is not None:
+            return hit
+        text = method(self, messages, **kwargs)
+        cache.set(key, text)
+        return text
+
+    return wrapper  # type: ignore[return-value]
+
+
+_RETRY_STATUSES = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    """Rate limits, server errors, timeouts, and dropped connections are worth retrying."""
+    status = getattr(exc, "status_code", None) or getattr(getattr(exc, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status in _RETRY_STATUSES
+    try:
+        import httpx
+    except ImportError:  # pragma: no cover - only when httpx is missing.
+        httpx = None
+    if httpx is not None and isinstance(exc, httpx.TransportError):
+        return True
+    try:
+        import openai
+    except ImportError:  # pragma: no cover - only when openai is missing.
+        return False
+    return isinstance(exc, openai.APIConnectionError)
+
+
+def _retry_after(exc: BaseException) -> float:
+    """Seconds the server asked us to wait via Retry-After headers, or 0."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return 0.0
+    for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(name)
+        if value:
+            try:
+                return float(value) * scale
+            except ValueError:  # HTTP-date form; fall back to our own backoff.
+                continue
+    return 0.0
+
+
+def _async_retry(*, max_attempts: int = 5, base: float = 0.5, jitter: float = 0.25) -> Callable[[_F], _F]:
+    """Retry an async call on retryable errors with capped exponential backoff plus jitter.
+
+    A server-supplied Retry-After wins when it asks for a longer wait. The wrapped
+    method is re-invoked from the top, so its rate limiter is consulted again.
+    """
+
+    def decorator(method: _F) -> _F:
+        @functools.wraps(method)
+        async def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+            for attempt in range(max_attempts):
+                try:
+                    return await method(self, *args, **kwargs)
+                except Exception as exc:
+                    if attempt + 1 >= max_attempts or not _is_retryable(exc):
+                        raise
+                    delay = max(_retry_after(exc), min(60.0, base * 2 ** attempt)) + random.random() * jitter
+                    logger.warning(
+                        "%s failed (%s); retry %d/%d in %.1fs",
+                        type(self).__name__, exc, attempt + 1, max_attempts - 1, delay,
+                    )
+                    await asyncio.sleep(delay)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def _coalesced(method: _F) -> _F:
+    """Share one in-flight ``acomplete`` call between concurrent identical requests.
+
+    Callers whose scope, messages, and options match an unfinished request await
+    that request instead of issuing their own. The persona's system prompt is part
+    of the messages, so different personas never share a reply.
+    """
+
+    @functools.wraps(method)
+    async def wrapper(self: Any, messages: Sequence[Dict[str, str]], **kwargs: Any) -> str:
+        inflight: Dict[str, asyncio.Future] = self._inflight
+        key = ResponseCache.key(self._cache_scope, messages, kwargs)
+        task = inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(method(self, messages, **kwargs))
+            inflight[key] = task
+            task.add_done_callback(lambda _: inflight.pop(key, None))
+        # Shielded so one caller being cancelled doesn't cancel the request for the rest.
+        return await asyncio.shield(task)
+
+    return wrapper  # type: ignore[return-value]
+
+
+# Prompts are sent static-first: every system message (persona and developer
+# instructions) goes ahead of the conversation, whatever order the caller used.
+# Those texts are identical from turn to turn, so converting them once and reusing
+# the result keeps the prefix byte-identical and provider-side prompt caches
+# (OpenAI, Gemini, and cache_control blocks for Anthropic-style APIs) hitting.
+# Never interpolate per-call values such as timestamps into system prompts.
+def _split_static_prefix(
+    messages: Sequence[Dict[str, str]],
+) -> Tuple[Tuple[str, ...], List[Dict[str, str]]]:
+    """Split messages into the system texts and the dynamic remainder, both in order."""
+    system_texts: List[str] = []
+    dynamic: List[Dict[str, str]] = []
+    for message in messages:
+        if message.get("role") == "system":
+            system_texts.append(message.get("content") or "")
+        else:
+            dynamic.append(message)
+    return tuple(system_texts), dynamic
+
+
+def _is_canonical_chat(messages: Sequence[Dict[str, str]], system_count: int) -> bool:
+    """True when ``messages`` is already static-first and holds only role/content pairs."""
+    return all(
+        len(message) == 2
+        and isinstance(message.get("role"), str)
+        and isinstance(message.get("content"), str)
+        and (message["role"] == "system") == (idx < system_count)
+        for idx, message in enumerate(messages)
+    )
+
+
+def _verify_prefix_stability(seen: Set[str], label: str, system_texts: Sequence[str]) -> None:
+    """Debug-log each distinct static prefix a client sends.
+
+    A client shared by P personas should settle at P prefixes; a count that keeps
+    climbing means something dynamic leaked into the system prompts.
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    digest = hashlib.sha256("\x00".join(system_texts).encode("utf-8")).hexdigest()
+    if digest not in seen:
+        seen.add(digest)
+        logger.debug("%s: new static prompt prefix %s (%d distinct)", label, digest[:12], len(seen))
+
+
+@functools.lru_cache(maxsize=64)
+def _chat_prefix(system_texts: Tuple[str, ...]) -> Tuple[Dict[str, str], ...]:
+    # Shared across calls; callers copy the tuple into a fresh list and never mutate entries.
+    return tuple({"role": "system", "content": text} for text in system_texts)
+
+
+@functools.lru_cache(maxsize=64)
+def _gemini_system_instruction(system_text: str) -> Dict[str, Any]:
+    return {"parts": [{"text": system_text}]}
+
+
+def _http_clients(provider: str, api_key: str, read_timeout: float = HTTP_TIMEOUT) -> Tuple[Any, Any]:
+    """Return (sync, async) httpx clients shared by every model using these credentials.
+
+    ``read_timeout`` applies when the pool is first built; pools are per provider,
+    so each provider passes the same value every time.
+    """
+    clients = _HTTP_CLIENTS.get((provider, api_key))
+    if clients is not None:
+        return clients
+
+    try:
+        import httpx
+    except ImportError as exc:  # pragma: no cover - surfaced only when httpx missing.
+        raise RuntimeError(
+            f"httpx package is required for the {provider} client. Install it via `pip install httpx`."
+        ) from exc
+
+    # HTTP/2 needs the optional h2 package; fall back to HTTP/1.1 keep-alive without it.
+    http2 = importlib.util.find_spec("h2") is not None
+    pool = {
+        "http2": http2,
+        "limits": httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+        ),
+        "timeout": httpx.Timeout(read_timeout, connect=HTTP_CONNECT_TIMEOUT),
+    }
+    clients = (httpx.Client(**pool), httpx.AsyncClient(**pool))
+    if not _HTTP_CLIENTS:
+        atexit.register(_close_http_clients)
+    _HTTP_CLIENTS[(provider, api_key)] = clients
+    return clients
+
+
+async def aclose_http_clients() -> None:
+    """Close and forget every shared httpx pool; call before the event loop shuts down.
+
+    Async pools are bound to the loop that used them, so the next ``asyncio.run``
+    gets fresh pools. Build new LLM clients for it: ones created earlier still
+    hold the closed pools.
+    """
+    while _HTTP_CLIENTS:
+        _, (client, async_client) = _HTTP_CLIENTS.popitem()
+        client.close()
+        if not async_client.is_closed:
+            await async_client.aclose()
+    _openai_clients.cache_clear()
+
+
+def _close_http_clients() -> None:
+    for client, async_client in list(_HTTP_CLIENTS.values()):
+        client.close()
+        if async_client.is_closed:
+            continue
+        try:
+            asyncio.run(async_client.aclose())
+        except Exception:  # pragma: no cover - pool may be bound to a loop that is already gone.
+            logger.debug("Could not close async HTTP client at exit", exc_info=True)
+    _HTTP_CLIENTS.clear()
+
 
 class OpenAILLMClient(LLMClient):
     """Adapter for OpenAI's Chat Completions API."""
@@ -16,22 +424,21 @@ class OpenAILLMClient(LLMClient):
         api_key: Optional[str] = None,
         organization: Optional[str] = None,
         default_options: Optional[Dict[str, Any]] = None,
+        rate_limiter: Optional[RateLimiter] = None,
     ) -> None:
-        try:
-            from openai import AsyncOpenAI, OpenAI
-        except ImportError as exc:  # pragma: no cover - surfaced at runtime for users.
-            raise RuntimeError(
-                "openai package is required for OpenAILLMClient."
-            ) from exc
-
-        self._client = OpenAI(api_key=api_key, organization=organization)
-        self._async_client = AsyncOpenAI(api_key=api_key, organization=organization)
+        self._client, self._async_client = _openai_clients(api_key, organization)
         self._model = model
-        self._defaults = default_options or {}
-
+        self._limiter = rate_limiter
+        # Read-only so the defaults can be handed to every call without copying.
+        self._defaults: Mapping[str, Any] = types.MappingProxyType(dict(default_options or {}))
+        self._cache_scope = ("openai", model, dict(self._defaults))
+        self._seen_prefixes: Set[str] = set()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    @_response_cached
     def complete(self, messages: Sequence[Dict[str, str]], **kwargs: Any) -> str:
         payload = self._format_messages(messages)
-        options = self._merge_options(dict(kwargs))
+        options = self._merge_options(kwargs)
         response = self._client.chat.completions.create(
             model=self._model,
             messages=payload,
@@ -39,9 +446,14 @@ class OpenAILLMClient(LLMClient):
         )
         return self._extract_text(response)
 
+    @_response_cached
+    @_coalesced
+    @_async_retry()
     async def acomplete(self, messages: Sequence[Dict[str, str]], **kwargs: Any) -> str:
+        if self._limiter is not None:
+            await self._limiter.acquire(estimate_tokens(messages))
         payload = self._format_messages(messages)
-        options = self._merge_options(dict(kwargs))
+        options = self._merge_options(kwargs)
         response = await self._async_client.chat.completions.create(
             model=self._model,
             messages=payload,
@@ -49,13 +461,102 @@ class OpenAILLMClient(LLMClient):
         )
         return self._extract_text(response)
 
-    def _merge_options(self, overrides: Dict[str, Any]) -> Dict[str, Any]:
-        options = dict(self._defaults)
-        options.update(overrides)
-        return options
+    def stream_complete(self, messages: Sequence[Dict[str, str]], **kwargs: Any) -> Iterator[str]:
+        """Yield the reply's text fragments as the API produces them."""
+        response = self._client.chat.completions.create(
+            model=self._model,
+            messages=self._format_messages(messages),
+            stream=True,
+            **self._merge_options(kwargs),
+        )
+        for chunk in response:
+            if chunk.choices:
+                yield chunk.choices[0].delta.content or ""
+
+    async def astream_complete(self, messages: Sequence[Dict[str, str]], **kwargs: Any) -> AsyncIterator[str]:
+        """Async variant of :meth:`stream_complete`."""
+        if self._limiter is not None:
+            await self._limiter.acquire(estimate_tokens(messages))
+        response = await self._async_client.chat.completions.create(
+            model=self._model,
+            messages=self._format_messages(messages),
+            stream=True,
+            **self._merge_options(kwargs),
+        )
+        async for chunk in response:
+            if chunk.choices:
+                yield chunk.choices[0].delta.content or ""
+
+    def batch_complete(
+        self,
+        batches: Sequence[Sequence[Dict[str, str]]],
+        *,
+        poll_interval: float = 10.0,
+        **kwargs: Any,
+    ) -> List[str]:
+        """Run many chat completions through the Batch API and return replies in input order.
+
+        Batches are billed at half price but may take up to 24h, so this suits offline
+        replays and dataset generation rather than live conversations. Entries the batch
+        failed to answer come back as empty strings.
+        """
+        options = self._merge_options(kwargs)
+        lines = []
+        for idx, messages in enumerate(batches):
+            body = {"model": self._model, "messages": self._format_messages(messages), **options}
+            lines.append(json.dumps({
+                "custom_id": f"req-{idx}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": body,
+            }))
+
+        upload = self._client.files.create(
+            file=("batch.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch",
+        )
+        batch = self._client.batches.create(
+            input_file_id=upload.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        while batch.status not in {"completed", "failed", "expired", "cancelled"}:
+            time.sleep(poll_interval)
+            batch = self._client.batches.retrieve(batch.id)
+        if batch.status != "completed":
+            raise RuntimeError(f"OpenAI batch {batch.id} ended with status '{batch.status}'")
+
+        replies = [""] * len(batches)
+        if not batch.output_file_id:
+            return replies
+        output = self._client.files.content(batch.output_file_id).text
+        for line in output.splitlines():
+            if not line:
+                continue
+            entry = json.loads(line)
+            idx = int(entry["custom_id"].split("-", 1)[1])
+            body = (entry.get("response") or {}).get("body") or {}
+            choices = body.get("choices") or []
+            if choices:
+                replies[idx] = (choices[0].get("message") or {}).get("content") or ""
+        return replies
+
+    def _merge_options(self, overrides: Dict[str, Any]) -> Mapping[str, Any]:
+        if not overrides:
+            return self._defaults
+        if not self._defaults:
+            return overrides
+        return {**self._defaults, **overrides}
 
     def _format_messages(self, messages: Sequence[Dict[str, str]]) -> Sequence[Dict[str, str]]:
-        return [{"role": msg["role"], "content": msg["content"]} for msg in messages]
+        system_texts, dynamic = _split_static_prefix(messages)
+        _verify_prefix_stability(self._seen_prefixes, f"openai/{self._model}", system_texts)
+        # The engine already emits canonical, static-first messages; send those as-is.
+        if _is_canonical_chat(messages, len(system_texts)):
+            return messages
+        payload: List[Dict[str, str]] = list(_chat_prefix(system_texts))
+        payload.extend({"role": msg["role"], "content": msg["content"]} for msg in dynamic)
+        return payload
 
     def _extract_text(self, response: Any) -> str:
         choice = response.choices[0]
@@ -73,39 +574,60 @@ class GeminiLLMClient(LLMClient):
         model: str,
         api_key: Optional[str] = None,
         client_options: Optional[Dict[str, Any]] = None,
+        rate_limiter: Optional[RateLimiter] = None,
     ) -> None:
-        try:
-            import requests
-        except ImportError as exc:  # pragma: no cover - surfaced only when requests missing.
-            raise RuntimeError(
-                "requests package is required for GeminiLLMClient. Install it via `pip install requests`."
-            ) from exc
-
         if not api_key:
             raise RuntimeError("GeminiLLMClient requires an API key")
 
-        self._requests = requests
-        self._session = requests.Session()
+        self._client, self._aclient = _http_clients("gemini", api_key)
         self._model = model
+        self._limiter = rate_limiter
         self._api_key = api_key
         options = client_options or {}
         self._generation_config = options.get("generation_config")
         self._safety_settings = options.get("safety_settings")
         self._request_timeout = options.get("timeout", 30)
+        self._cache_scope = ("gemini", model, self._generation_config, self._safety_settings)
+        self._seen_prefixes: Set[str] = set()
+        self._inflight: Dict[str, asyncio.Future] = {}
 
+    @_response_cached
     def complete(self, messages: Sequence[Dict[str, str]], **kwargs: Any) -> str:
-        payload = self._build_payload(messages)
-        if kwargs:
-            payload.setdefault("generation_config", {}).update(kwargs.get("generation_config", {}))
-        response = self._session.post(
+        response = self._client.post(
+            self._endpoint,
+            params={"key": self._api_key},
+            headers=_JSON_HEADERS,
+            content=_dumps(self._request_payload(messages, kwargs)),
+            timeout=self._request_timeout,
+        )
+        response.raise_for_status()
+        return self._extract_text(_loads(response.content))
+
+    @_response_cached
+    @_coalesced
+    @_async_retry()
+    async def acomplete(self, messages: Sequence[Dict[str, str]], **kwargs: Any) -> str:
+        if self._limiter is not None:
+            await self._limiter.acquire(estimate_tokens(messages))
+        response = await self._aclient.post(
             self._endpoint,
             params={"key": self._api_key},
-            json=payload,
+            headers=_JSON_HEADERS,
+            content=_dumps(self._request_payload(messages, kwargs)),
             timeout=self._request_timeout,
         )
         response.raise_for_status()
-        data = response.json()
-        return self._extract_text(data)
+        return self._extract_text(_loads(response.content))
+
+    def _request_payload(self, messages: Sequence[Dict[str, str]], overrides: Dict[str, Any]) -> Dict[str, Any]:
+        payload = self._build_payload(messages)
+        if overrides:
+            # Copy so overrides never leak into the persona's configured generation_config.
+            payload["generation_config"] = {
+                **payload.get("generation_config", {}),
+                **overrides.get("generation_config", {}),
+            }
+        return payload
 
     @property
     def _endpoint(self) -> str:
@@ -133,12 +655,12 @@ class GeminiLLMClient(LLMClient):
         if not contents:
             contents.append({"role": "user", "parts": [{"text": ""}]})
 
-        payload: Dict[str, Any] = {"contents": contents}
-
+        # system_instruction is emitted ahead of contents so the serialized prefix stays stable.
+        payload: Dict[str, Any] = {}
         if system_parts:
-            payload["system_instruction"] = {
-                "parts": [{"text": "\n\n".join(system_parts)}]
-            }
+            _verify_prefix_stability(self._seen_prefixes, f"gemini/{self._model}", system_parts)
+            payload["system_instruction"] = _gemini_system_instruction("\n\n".join(system_parts))
+        payload["contents"] = contents
 
         if self._generation_config:
             payload["generation_config"] = self._generation_config
@@ -169,47 +691,65 @@ class GrokLLMClient(LLMClient):
         model: str,
         api_key: Optional[str] = None,
         client_options: Optional[Dict[str, Any]] = None,
+        rate_limiter: Optional[RateLimiter] = None,
     ) -> None:
-        try:
-            import requests
-        except ImportError as exc:  # pragma: no cover - surfaced only when requests missing.
-            raise RuntimeError(
-                "requests package is required for GrokLLMClient. Install it via `pip install requests`."
-            ) from exc
-
         if not api_key:
             raise RuntimeError("GrokLLMClient requires an API key")
 
-        self._requests = requests
-        self._session = requests.Session()
+        self._client, self._aclient = _http_clients("grok", api_key)
         self._model = model
+        self._limiter = rate_limiter
         self._api_key = api_key
+        self._headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        }
         opts = dict(client_options or {})
         self._timeout = opts.pop("timeout", 30)
-        self._defaults = opts
+        self._defaults: Mapping[str, Any] = types.MappingProxyType(opts)
+        self._cache_scope = ("grok", model, opts)
+        self._seen_prefixes: Set[str] = set()
+        self._inflight: Dict[str, asyncio.Future] = {}
 
+    @_response_cached
     def complete(self, messages: Sequence[Dict[str, str]], **kwargs: Any) -> str:
-        payload = self._build_payload(messages)
-        options = dict(self._defaults)
-        options.update(kwargs)
-        payload.update({key: value for key, value in options.items() if value is not None})
+        response = self._client.post(
+            f"{self._API_ROOT}/chat/completions",
+            headers=self._headers,
+            content=_dumps(self._request_payload(messages, kwargs)),
+            timeout=self._timeout,
+        )
+        response.raise_for_status()
+        return self._extract_text(_loads(response.content))
 
-        response = self._session.post(
+    @_response_cached
+    @_coalesced
+    @_async_retry()
+    async def acomplete(self, messages: Sequence[Dict[str, str]], **kwargs: Any) -> str:
+        if self._limiter is not None:
+            await self._limiter.acquire(estimate_tokens(messages))
+        response = await self._aclient.post(
             f"{self._API_ROOT}/chat/completions",
-            headers={
-                "Authorization": f"Bearer {self._api_key}",
-                "Content-Type": "application/json",
-            },
-            json=payload,
+            headers=self._headers,
+            content=_dumps(self._request_payload(messages, kwargs)),
             timeout=self._timeout,
         )
         response.raise_for_status()
-        data = response.json()
-        return self._extract_text(data)
+        return self._extract_text(_loads(response.content))
+
+    def _request_payload(self, messages: Sequence[Dict[str, str]], overrides: Dict[str, Any]) -> Dict[str, Any]:
+        payload = self._build_payload(messages)
+        options = {**self._defaults, **overrides} if overrides else self._defaults
+        payload.update({key: value for key, value in options.items() if value is not None})
+        return payload
 
     def _build_payload(self, messages: Sequence[Dict[str, str]]) -> Dict[str, Any]:
-        formatted: List[Dict[str, str]] = []
-        for message in messages:
+        system_texts, dynamic = _split_static_prefix(messages)
+        _verify_prefix_stability(self._seen_prefixes, f"grok/{self._model}", system_texts)
+        if messages and _is_canonical_chat(messages, len(system_texts)):
+            return {"model": self._model, "messages": messages}
+        formatted: List[Dict[str, str]] = list(_chat_prefix(system_texts))
+        for message in dynamic:
             role = message.get("role") or "user"
             content = message.get("content") or ""
             formatted.append({"role": role, "content": content})
@@ -2,17 +2,42 @@
 from __future__ import annotations
 
 import asyncio
+import atexit
 import functools
+import json
+import os
 import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Protocol, Sequence, runtime_checkable
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Protocol,
+    Sequence,
+    Tuple,
+    Union,
+    runtime_checkable,
+)
 
 try:  # PyYAML is optional but required to load personas.
     import yaml  # type: ignore
 except ImportError:  # pragma: no cover - surfaced with a helpful error later.
     yaml = None
 
+# libyaml's C loader when PyYAML was built with it; the pure-Python loader otherwise.
+_YAML_LOADER = getattr(yaml, "CSafeLoader", None) or getattr(yaml, "SafeLoader", None)
+
+# dataclass(slots=True) needs Python 3.10+; older interpreters keep a per-instance __dict__.
+_SLOTS: Dict[str, bool] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 
 @dataclass
 class Persona:
@@ -38,6 +63,11 @@ class Persona:
             llm=raw.get("llm", {}),
         )
 
+    @functools.cached_property
+    def template_context(self) -> Dict[str, Any]:
+        """Template context built on first use; personas are not mutated after loading."""
+        return self.to_template_context()
+
     def to_template_context(self) -> Dict[str, Any]:
         return {
             "key": self.key,
@@ -59,7 +89,7 @@ class PromptSet:
     user: str
 
 
-@dataclass
+@dataclass(frozen=True, **_SLOTS)
 class ConversationTurn:
     speaker: str
     text: str
@@ -93,6 +123,14 @@ class SupportsAComplete(Protocol):
         """Asynchronously return the model response."""
 
 
+@runtime_checkable
+class SupportsAStream(Protocol):
+    """Optional async streaming interface for LLM backends."""
+
+    def astream_complete(self, messages: Sequence[Dict[str, str]], **kwargs: Any) -> AsyncIterator[str]:
+        """Yield the model response in fragments as they arrive."""
+
+
 class EchoLLMClient:
     """Fallback client useful for local smoke tests."""
 
@@ -102,111 +140,183 @@ class EchoLLMClient:
         return f"[echo] {payload.strip()}"
 
 
-class TemplateRenderer:
-    """Very small Handlebars-inspired renderer for the project templates."""
-
-    _section_re = re.compile(r"{{#(each|if) ([^}]+)}}")
-    _open_re = re.compile(r"{{#(each|if) [^}]+}}")
-    _var_re = re.compile(r"{{([^#/{][^}]*)}}")
+def _build_layer(value: Any) -> Dict[str, Any]:
+    if type(value) is str:
+        return {"this": value}
+    if isinstance(value, dict):
+        layer = dict(value)
+        layer.setdefault("this", value)
+        return layer
+    if isinstance(value, tuple) and len(value) == 2:
+        key, val = value
+        return {"key": key, "value": val, "this": value}
+    return {"this": value}
 
-    def render(self, template: str, context: Dict[str, Any]) -> str:
-        return self._render(template, [context])
 
-    def _render(self, template: str, context_stack: List[Dict[str, Any]]) -> str:
-        result: List[str] = []
-        idx = 0
-        while idx < len(template):
-            match = self._section_re.search(template, idx)
-            if not match:
-                result.append(self._replace_variables(template[idx:], context_stack))
-                break
+def _split_path(expression: str) -> Tuple[str, ...]:
+    # Interned, like identifier-shaped context keys, so dict lookups usually hit on identity.
+    return tuple(sys.intern(part) for part in expression.strip().split("."))
 
-            start, section_start = match.span()
-            result.append(self._replace_variables(template[idx:start], context_stack))
 
-            tag_type = match.group(1)
-            expression = match.group(2).strip()
-            section_body, section_end = self._extract_section(template, section_start, tag_type)
+def _resolve(path: Tuple[str, ...], context_stack: List[Dict[str, Any]]) -> Any:
+    head = path[0]
+    if len(path) == 1:
+        for layer in context_stack:
+            if head in layer:
+                return layer[head]
+        return None
 
-            if tag_type == "each":
-                values = self._resolve(expression, context_stack)
+    rest = path[1:]
+    for layer in context_stack:
+        if head in layer:
+            value: Any = layer[head]
+            for part in rest:
+                if isinstance(value, dict):
+                    value = value.get(part)
+                else:
+                    value = getattr(value, part, None)
+                if value is None:
+                    break
+            else:
+                return value
+    return None
+
+
+def _op_names(op: tuple) -> FrozenSet[str]:
+    """Context names an op may read; section bodies count in full, since lookups fall through."""
+    kind = op[0]
+    if kind == "text":
+        return frozenset()
+    if kind == "var":
+        return frozenset((op[1][0],))
+    return op[2].names | {op[1][0]}
+
+
+class CompiledTemplate:
+    """A template parsed once into ops that render without any regex work.
+
+    Ops are ``("text", str)``, ``("var", path)``, ``("each", path, body)`` and
+    ``("if", path, body)``, where ``path`` is the dotted expression pre-split into
+    a tuple and ``body`` is a nested :class:`CompiledTemplate`. ``names`` holds every
+    top-level context name the template may read.
+    """
+
+    __slots__ = ("ops", "names")
+
+    def __init__(self, ops: Tuple[tuple, ...]) -> None:
+        self.ops = ops
+        self.names: FrozenSet[str] = frozenset().union(*(_op_names(op) for op in ops))
+
+    def partial(self, context: Dict[str, Any], dynamic: FrozenSet[str]) -> "CompiledTemplate":
+        """Pre-render every top-level op that reads none of the ``dynamic`` names.
+
+        The result keeps only the ops that depend on ``dynamic`` (merged with the
+        surrounding literal text), so rendering it later with a context that agrees
+        with ``context`` on every other name yields the same output.
+        """
+        ops: List[tuple] = []
+        for op in self.ops:
+            if op[0] != "text" and _op_names(op) & dynamic:
+                ops.append(op)
+                continue
+            text = op[1] if op[0] == "text" else CompiledTemplate((op,)).render([context])
+            if ops and ops[-1][0] == "text":
+                ops[-1] = ("text", ops[-1][1] + text)
+            elif text:
+                ops.append(("text", text))
+        return CompiledTemplate(tuple(ops))
+
+    def render(self, context_stack: List[Dict[str, Any]]) -> str:
+        out: List[str] = []
+        self._emit(context_stack, out)
+        return "".join(out)
+
+    def _emit(self, context_stack: List[Dict[str, Any]], out: List[str]) -> None:
+        # Sections write into the caller's list, so nested bodies are joined only once.
+        for op in self.ops:
+            kind = op[0]
+            if kind == "text":
+                out.append(op[1])
+            elif kind == "var":
+                value = _resolve(op[1], context_stack)
+                if value is not None:
+                    out.append(str(value))
+            elif kind == "each":
+                values = _resolve(op[1], context_stack)
                 if values:
+                    # Lists (history, persona bullet points) are the common case; check the
+                    # exact type before falling back to the slower ABC instance check.
                     iterable: Iterable[Any]
-                    if isinstance(values, dict):
+                    kind = type(values)
+                    if kind is list or kind is tuple:
+                        iterable = values
+                    elif isinstance(values, dict):
                         iterable = values.items()
                     elif isinstance(values, (str, bytes)):
-                        iterable = [values]
+                        iterable = (values,)
                     elif isinstance(values, Iterable):
                         iterable = values
                     else:
-                        iterable = []
+                        iterable = ()
+                    body = op[2]
                     for item in iterable:
-                        layer = self._build_layer(item)
-                        result.append(self._render(section_body, [layer] + context_stack))
+                        body._emit([_build_layer(item)] + context_stack, out)
             else:  # if-block
-                value = self._resolve(expression, context_stack)
+                value = _resolve(op[1], context_stack)
                 if value:
-                    layer = self._build_layer(value)
-                    result.append(self._render(section_body, [layer] + context_stack))
+                    op[2]._emit([_build_layer(value)] + context_stack, out)
 
-            idx = section_end
 
-        return "".join(result)
+class TemplateRenderer:
+    """Very small Handlebars-inspired renderer for the project templates."""
 
-    def _build_layer(self, value: Any) -> Dict[str, Any]:
-        if isinstance(value, dict):
-            layer = dict(value)
-            layer.setdefault("this", value)
-            return layer
-        if isinstance(value, tuple) and len(value) == 2:
-            key, val = value
-            return {"key": key, "value": val, "this": value}
-        return {"this": value}
+    # One pass over the template: every {{...}} tag is a section open, close, or variable.
+    _tag_re = re.compile(r"{{(?:#(each|if) ([^}]+)|/(each|if)|([^#/{][^}]*))}}")
 
-    def _replace_variables(self, text: str, context_stack: List[Dict[str, Any]]) -> str:
-        def repl(match: re.Match[str]) -> str:
-            expr = match.group(1).strip()
-            value = self._resolve(expr, context_stack)
-            return "" if value is None else str(value)
-
-        return self._var_re.sub(repl, text)
-
-    def _extract_section(self, template: str, start: int, tag_type: str) -> (str, int):
-        close_tag = f"{{{{/{tag_type}}}}}"
-        idx = start
-        depth = 1
-        while depth:
-            next_open = self._open_re.search(template, idx)
-            next_close = template.find(close_tag, idx)
-            if next_close == -1:
-                raise ValueError(f"Unclosed section for {tag_type}")
-            if next_open and next_open.start() < next_close:
-                depth += 1
-                idx = next_open.end()
+    def render(self, template: Union[str, CompiledTemplate], context: Dict[str, Any]) -> str:
+        compiled = template if isinstance(template, CompiledTemplate) else self.compile(template)
+        return compiled.render([context])
+
+    @classmethod
+    @functools.lru_cache(maxsize=64)
+    def compile(cls, template: str) -> CompiledTemplate:
+        """Parse ``template`` into a :class:`CompiledTemplate`, once per distinct string.
+
+        The cache is keyed by template text and shared by every renderer, so prompt
+        strings must not be mutated after loading.
+        """
+        # Each stack frame is (tag_type, path, ops collected for that section).
+        stack: List[Tuple[Optional[str], Tuple[str, ...], List[tuple]]] = [(None, (), [])]
+        idx = 0
+        for match in cls._tag_re.finditer(template):
+            ops = stack[-1][2]
+            if match.start() > idx:
+                ops.append(("text", template[idx:match.start()]))
+            idx = match.end()
+            open_type, expression, close_type, variable = match.groups()
+            if variable is not None:
+                ops.append(("var", _split_path(variable)))
+            elif open_type is not None:
+                stack.append((open_type, _split_path(expression), []))
+            elif stack[-1][0] == close_type:
+                tag_type, path, body = stack.pop()
+                stack[-1][2].append((tag_type, path, CompiledTemplate(tuple(body))))
             else:
-                depth -= 1
-                idx = next_close + len(close_tag)
-        body_start = start
-        body_end = idx - len(close_tag)
-        return template[body_start:body_end], idx
-
-    def _resolve(self, expression: str, context_stack: List[Dict[str, Any]]) -> Any:
-        path = expression.split('.')
-        for layer in context_stack:
-            if path[0] in layer:
-                value: Any = layer[path[0]]
-                for part in path[1:]:
-                    if isinstance(value, dict):
-                        value = value.get(part)
-                    else:
-                        value = getattr(value, part, None)
-                    if value is None:
-                        break
-                else:
-                    return value
-                if value is not None:
-                    return value
-        return None
+                raise ValueError(f"Unexpected {{{{/{close_type}}}}} closing tag")
+        if len(stack) > 1:
+            raise ValueError(f"Unclosed section for {stack[-1][0]}")
+        if idx < len(template):
+            stack[0][2].append(("text", template[idx:]))
+        return CompiledTemplate(tuple(stack[0][2]))
+
+
+# Sync-only clients block a thread per request; size the pool for network concurrency
+# rather than the default executor's CPU-based cap, and keep it apart from the host app's.
+_LLM_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv("BANTER_LLM_WORKERS", "128")),
+    thread_name_prefix="llm",
+)
+atexit.register(_LLM_EXECUTOR.shutdown)
 
 
 async def _call_llm_async(
@@ -219,7 +329,12 @@ async def _call_llm_async(
         return await llm.acomplete(messages, **opts)  # type: ignore[arg-type]
     loop = asyncio.get_running_loop()
     func = functools.partial(llm.complete, messages, **opts)
-    return await loop.run_in_executor(None, func)
+    return await loop.run_in_executor(_LLM_EXECUTOR, func)
+
+
+DEFAULT_HISTORY_WINDOW = 12
+# Context names whose values change between turns of one conversation.
+_TURN_DYNAMIC_NAMES: FrozenSet[str] = frozenset({"history"})
 
 
 @dataclass
@@ -235,6 +350,17 @@ class Agent:
     default_length_limit: int = 280
     llm_display: str = ""
     parameters: Dict[str, Any] = field(default_factory=dict)
+    # Most recent turns rendered into the prompt; None takes persona llm.history_window,
+    # falling back to DEFAULT_HISTORY_WINDOW.
+    history_window: Optional[int] = None
+    _partials: Dict[tuple, Tuple[CompiledTemplate, ...]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        if self.history_window is None:
+            configured = (self.persona.llm or {}).get("history_window")
+            self.history_window = configured if isinstance(configured, int) else DEFAULT_HISTORY_WINDOW
 
     def _build_messages(
         self,
@@ -245,19 +371,45 @@ class Agent:
         length_limit: Optional[int],
     ) -> List[Dict[str, str]]:
         ctx = {
-            "persona": self.persona.to_template_context(),
+            "persona": self.persona.template_context,
             "round_rule": round_rule or self.default_round_rule,
             "length_limit": length_limit or self.default_length_limit,
             "topic": topic,
-            "history": [turn.as_dict() for turn in conversation.turns],
         }
+        system, developer, user = self._partial_prompts(ctx)
+        ctx["history"] = conversation.history_tail(self.history_window)
 
         return [
-            {"role": "system", "content": self.renderer.render(self.prompts.system, ctx)},
-            {"role": "system", "content": self.renderer.render(self.prompts.developer, ctx)},
-            {"role": "user", "content": self.renderer.render(self.prompts.user, ctx)},
+            {"role": "system", "content": self.renderer.render(system, ctx)},
+            {"role": "system", "content": self.renderer.render(developer, ctx)},
+            {"role": "user", "content": self.renderer.render(user, ctx)},
         ]
 
+    def _partial_prompts(self, ctx: Dict[str, Any]) -> Tuple[CompiledTemplate, ...]:
+        """Prompt templates with everything except the history pre-rendered for ``ctx``.
+
+        Only ``history`` changes from turn to turn, so the persona, round rule, and
+        topic sections are rendered once per combination and reused.
+        """
+        prompts = self.prompts
+        key = (
+            id(self.persona),
+            prompts.system,
+            prompts.developer,
+            prompts.user,
+            ctx["round_rule"],
+            ctx["length_limit"],
+            ctx["topic"],
+        )
+        partials = self._partials.get(key)
+        if partials is None:
+            partials = tuple(
+                self.renderer.compile(template).partial(ctx, _TURN_DYNAMIC_NAMES)
+                for template in (prompts.system, prompts.developer, prompts.user)
+            )
+            self._partials[key] = partials
+        return partials
+
     def respond(
         self,
         conversation: "Conversation",
@@ -274,13 +426,7 @@ class Agent:
             length_limit=length_limit,
         )
         payload = self.llm.complete(messages, **(llm_options or {}))
-        reply = payload.strip()
-        return ConversationTurn(
-            speaker=self.persona.key,
-            text=reply,
-            llm_display=self.llm_display,
-            parameters=self.parameters,
-        )
+        return self._turn_from_reply(payload)
 
     async def arespond(
         self,
@@ -298,10 +444,43 @@ class Agent:
             length_limit=length_limit,
         )
         payload = await _call_llm_async(self.llm, messages, llm_options)
-        reply = payload.strip()
+        return self._turn_from_reply(payload)
+
+    async def astream_respond(
+        self,
+        conversation: "Conversation",
+        *,
+        topic: str,
+        on_token: Callable[[str], None],
+        round_rule: Optional[str] = None,
+        length_limit: Optional[int] = None,
+        llm_options: Optional[Dict[str, Any]] = None,
+    ) -> ConversationTurn:
+        """Like :meth:`arespond`, but hand each text fragment to ``on_token`` as it arrives.
+
+        Clients without ``astream_complete`` deliver the whole reply as one fragment.
+        """
+        messages = self._build_messages(
+            conversation,
+            topic=topic,
+            round_rule=round_rule,
+            length_limit=length_limit,
+        )
+        if isinstance(self.llm, SupportsAStream):
+            pieces: List[str] = []
+            async for token in self.llm.astream_complete(messages, **(llm_options or {})):
+                pieces.append(token)
+                on_token(token)
+            payload = "".join(pieces)
+        else:
+            payload = await _call_llm_async(self.llm, messages, llm_options)
+            on_token(payload)
+        return self._turn_from_reply(payload)
+
+    def _turn_from_reply(self, payload: str) -> ConversationTurn:
         return ConversationTurn(
             speaker=self.persona.key,
-            text=reply,
+            text=payload.strip(),
             llm_display=self.llm_display,
             parameters=self.parameters,
         )
@@ -313,6 +492,21 @@ class Conversation:
 
     topic: str
     turns: List[ConversationTurn] = field(default_factory=list)
+    # Append-only mirror of ``turns`` in template form; see history_context().
+    _history: List[Dict[str, Any]] = field(default_factory=list, init=False, repr=False, compare=False)
+
+    def history_context(self) -> List[Dict[str, Any]]:
+        """Return ``turns`` as template dicts, serializing only turns added since the last call.
+
+        The list is reused across turns, so callers must treat it as read-only. Turns are
+        expected to be appended; if the transcript shrinks the mirror is rebuilt.
+        """
+        history = self._history
+        if len(history) > len(self.turns):
+            history.clear()
+        if len(history) < len(self.turns):
+            history.extend(turn.as_dict() for turn in self.turns[len(history):])
+        return history
 
     def step(
         self,
@@ -350,28 +544,210 @@ class Conversation:
         self.turns.append(turn)
         return turn
 
+    async def astep_many(
+        self,
+        agents: Sequence[Agent],
+        *,
+        round_rule: Optional[str] = None,
+        length_limit: Optional[int] = None,
+        llm_options: Optional[Dict[str, Any]] = None,
+    ) -> List[ConversationTurn]:
+        """Request one turn from each agent concurrently, then append them in agent order.
+
+        Every agent sees the transcript as it stood before the call, so use this for
+        independent replies rather than a back-and-forth exchange.
+        """
+        turns = await asyncio.gather(
+            *(
+                agent.arespond(
+                    self,
+                    topic=self.topic,
+                    round_rule=round_rule,
+                    length_limit=length_limit,
+                    llm_options=llm_options,
+                )
+                for agent in agents
+            )
+        )
+        self.turns.extend(turns)
+        return list(turns)
+
+    async def astream_step(
+        self,
+        agent: Agent,
+        *,
+        on_token: Callable[[str], None],
+        round_rule: Optional[str] = None,
+        length_limit: Optional[int] = None,
+        llm_options: Optional[Dict[str, Any]] = None,
+    ) -> ConversationTurn:
+        turn = await agent.astream_respond(
+            self,
+            topic=self.topic,
+            on_token=on_token,
+            round_rule=round_rule,
+            length_limit=length_limit,
+            llm_options=llm_options,
+        )
+        self.turns.append(turn)
+        return turn
+
+    def replay_batch(
+        self,
+        agents: Sequence[Agent],
+        *,
+        round_rule: Optional[str] = None,
+        length_limit: Optional[int] = None,
+        llm_options: Optional[Dict[str, Any]] = None,
+    ) -> List[ConversationTurn]:
+        """Generate one turn per agent through provider batch submission.
+
+        Intended for offline replays: every agent sees the transcript as it stands,
+        agents sharing a client go out in a single batch, and the turns are appended
+        in agent order. Each client must expose ``batch_complete``.
+        """
+        groups: Dict[int, List[int]] = {}
+        for idx, agent in enumerate(agents):
+            if not hasattr(agent.llm, "batch_complete"):
+                raise TypeError(f"LLM client for agent {agent.key} does not support batch_complete")
+            groups.setdefault(id(agent.llm), []).append(idx)
+
+        replies: List[str] = [""] * len(agents)
+        for indices in groups.values():
+            llm = agents[indices[0]].llm
+            batches = [
+                agents[idx]._build_messages(
+                    self,
+                    topic=self.topic,
+                    round_rule=round_rule,
+                    length_limit=length_limit,
+                )
+                for idx in indices
+            ]
+            for idx, reply in zip(indices, llm.batch_complete(batches, **(llm_options or {}))):  # type: ignore[attr-defined]
+                replies[idx] = reply
+
+        turns = [agent._turn_from_reply(reply) for agent, reply in zip(agents, replies)]
+        self.turns.extend(turns)
+        return turns
+
+    def history_tail(self, window: int) -> List[Dict[str, Any]]:
+        """The last ``window`` entries of :meth:`history_context` (read-only)."""
+        history = self.history_context()
+        if len(history) <= window:
+            return history
+        return history[max(len(history) - window, 0):]
+
     def as_history(self) -> List[Dict[str, str]]:
-        return [turn.as_dict() for turn in self.turns]
+        """Return the transcript as dicts; the dicts are shared with the history mirror."""
+        return list(self.history_context())
+
+
+async def run_conversations(
+    conversations: Sequence[Conversation],
+    schedules: Sequence[Sequence[Agent]],
+    *,
+    concurrency: int = 64,
+    round_rule: Optional[str] = None,
+    length_limit: Optional[int] = None,
+    llm_options: Optional[Dict[str, Any]] = None,
+) -> List[List[ConversationTurn]]:
+    """Drive independent conversations concurrently, each through its own agent schedule.
+
+    Turns within a conversation stay sequential; across conversations at most
+    ``concurrency`` LLM calls are in flight, which keeps batching backends busy
+    without tripping provider limits.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def drive(conversation: Conversation, schedule: Sequence[Agent]) -> List[ConversationTurn]:
+        turns: List[ConversationTurn] = []
+        for agent in schedule:
+            async with semaphore:
+                turns.append(
+                    await conversation.astep(
+                        agent,
+                        round_rule=round_rule,
+                        length_limit=length_limit,
+                        llm_options=llm_options,
+                    )
+                )
+        return turns
+
+    return list(await asyncio.gather(*(drive(c, s) for c, s in zip(conversations, schedules))))
+
+
+_PROMPT_FILES = ("system.md", "developer.md", "user.md")
 
 
 def load_personas(path: Path) -> Dict[str, Persona]:
-    if yaml is None:
-        raise RuntimeError("PyYAML is required to load persona definitions")
-    with path.open("r", encoding="utf-8") as handle:
-        payload = yaml.safe_load(handle) or {}
+    """Load persona definitions, re-parsing the file only when its mtime changes."""
+    resolved = Path(path).resolve()
+    return dict(_load_personas_cached(str(resolved), resolved.stat().st_mtime_ns))
+
+
+@functools.lru_cache(maxsize=8)
+def _load_personas_cached(path: str, mtime_ns: int) -> Dict[str, Persona]:
+    payload = _read_persona_payload(Path(path), mtime_ns)
     personas: Dict[str, Persona] = {}
     for key, raw in payload.get("personas", {}).items():
         personas[key] = Persona.from_dict(key, raw)
     return personas
 
 
+def _read_persona_payload(path: Path, mtime_ns: int) -> Dict[str, Any]:
+    """Parse the persona YAML, preferring a sibling ``.json`` copy that is at least as new."""
+    json_path = path.with_suffix(path.suffix + ".json")
+    try:
+        if json_path.stat().st_mtime_ns >= mtime_ns:
+            with open(json_path, "r", encoding="utf-8") as handle:
+                return json.load(handle)
+    except (OSError, ValueError):
+        pass
+
+    if yaml is None:
+        raise RuntimeError("PyYAML is required to load persona definitions")
+    with open(path, "r", encoding="utf-8") as handle:
+        payload = yaml.load(handle, Loader=_YAML_LOADER) or {}
+    tmp_path = json_path.with_name(f"{json_path.name}.{os.getpid()}.tmp")
+    try:
+        text = json.dumps(payload, ensure_ascii=False)
+        if json.loads(text) != payload:
+            # Non-string keys (ints, bools) would come back as strings; don't cache a different payload.
+            json_path.unlink(missing_ok=True)
+            return payload
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            handle.write(text)
+        os.replace(tmp_path, json_path)
+    except (OSError, TypeError, ValueError):  # read-only checkout, or YAML values JSON can't hold.
+        try:
+            tmp_path.unlink(missing_ok=True)
+        except OSError:
+            pass
+    return payload
+
+
 def load_prompts(base_dir: Path) -> PromptSet:
-    system = (base_dir / "system.md").read_text(encoding="utf-8")
-    developer = (base_dir / "developer.md").read_text(encoding="utf-8")
-    user = (base_dir / "user.md").read_text(encoding="utf-8")
+    """Load the prompt templates, re-reading them only when a file's mtime changes."""
+    root = Path(base_dir).resolve()
+    mtimes = tuple((root / name).stat().st_mtime_ns for name in _PROMPT_FILES)
+    return _load_prompts_cached(str(root), mtimes)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_prompts_cached(base_dir: str, mtimes: Tuple[int, ...]) -> PromptSet:
+    root = Path(base_dir)
+    system, developer, user = ((root / name).read_text(encoding="utf-8") for name in _PROMPT_FILES)
+    # Compile up front so the first turn doesn't pay for parsing.
+    for template in (system, developer, user):
+        TemplateRenderer.compile(template)
     return PromptSet(system=system, developer=developer, user=user)
 
 
+load_personas.cache_clear = _load_personas_cached.cache_clear  # type: ignore[attr-defined]
+load_prompts.cache_clear = _load_prompts_cached.cache_clear  # type: ignore[attr-defined]
+
+
 if __name__ == "__main__":  # pragma: no cover - convenience smoke test.
     root = Path(__file__).resolve().parent.parent
     personas = load_personas(root / "codex" / "personas.yaml")
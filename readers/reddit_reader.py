@@ -1,15 +1,23 @@
 import os
 import sys
 import json
-import random
 from pathlib import Path
 
+try:  # orjson is optional; it decodes large dumps several times faster than json.
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - falls back to the stdlib codec.
+    orjson = None
+
+try:  # ijson is optional; it streams entries without holding the whole dump.
+    import ijson  # type: ignore
+except ImportError:  # pragma: no cover - falls back to loading the whole file.
+    ijson = None
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.append(str(PROJECT_ROOT))
 
-from tts_voice import speak
+from tts_voice import fetch_available_voices, speak_all, voice_for
 
 
 
@@ -17,53 +25,50 @@ from tts_voice import speak
 # 📄 Load Reddit JSON File
 # ==========================================
 def load_reddit_json(filename):
+    if orjson is not None:
+        return orjson.loads(Path(filename).read_bytes())
     with open(filename, "r") as f:
         return json.load(f)
 
 
-# ==========================================
-# 🔀 Assign Voices to Users
-# ==========================================
-def assign_voices(users, voices):
-    random.shuffle(voices)
-    mapping = {}
-    for i, user in enumerate(users):
-        mapping[user] = voices[i % len(voices)]
-    return mapping
+def iter_reddit_entries(filename):
+    """Yield top-level comment entries, streaming the file when ijson is installed."""
+    if ijson is None:
+        yield from load_reddit_json(filename)
+        return
+    with open(filename, "rb") as f:
+        yield from ijson.items(f, "item")
+
 
 # ==========================================
 # 🧠 Main Logic
 # ==========================================
 def read_comments(filename):
-    data = load_reddit_json(filename)
-
-    comments = []
-    users = set()
-    for entry in data:
-        user = entry.get("user_posted", "UnknownUser")
-        text = entry.get("comment", "")
+    # Parallel speaker/text lists in reading order: each comment followed by its replies.
+    users_arr = []
+    texts_arr = []
+    for entry in iter_reddit_entries(filename):
+        text = entry.get("comment")
         if text:
-            comments.append((user, text))
-            users.add(user)
-
-        replies = entry.get("replies") or []
-        for reply in replies:
-            ruser = reply.get("user_replying", "UnknownReply")
-            rtext = reply.get("reply", "")
+            users_arr.append(entry.get("user_posted", "UnknownUser"))
+            texts_arr.append(text)
+        for reply in entry.get("replies") or ():
+            rtext = reply.get("reply")
             if rtext:
-                comments.append((ruser, rtext))
-                users.add(ruser)
-
-    voices = speak.fetch_available_voices()
-    user_voice_map = assign_voices(users, voices)
-
-    for idx, (user, text) in enumerate(comments):
-        voice_id = user_voice_map.get(user, random.choice(voices))
-        print(f"\n🗣️ {user} ({voice_id}): {text}")
-        try:
-            speak.speak(text, voice_id)
-        except Exception as e:
-            print(f"❌ Failed to speak for {user}: {e}")
+                users_arr.append(reply.get("user_replying", "UnknownReply"))
+                texts_arr.append(rtext)
+
+    voices = fetch_available_voices()
+    voices_arr = [voice_for(user, voices) for user in users_arr]
+
+    def announce(idx):
+        print(f"\n🗣️ {users_arr[idx]} ({voices_arr[idx]}): {texts_arr[idx]}")
+
+    def report_failure(idx, e):
+        print(f"❌ Failed to speak for {users_arr[idx]}: {e}")
+
+    # Clips for upcoming comments are fetched while the current one plays.
+    speak_all(zip(texts_arr, voices_arr), announce=announce, on_error=report_failure)
 
 # ==========================================
 # 🚀 Run
@@ -1,75 +1,67 @@
-import time
-from tts_voice import speak
-import random
+from tts_voice import fetch_available_voices, speak_all, voice_for
 import os
-from selenium import webdriver
-from selenium.webdriver.common.by import By
+import html
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+import xml.etree.ElementTree as ET
 
+import requests
 
+
+# One or more profile URLs or handles, comma-separated.
 TWITTER_URL = os.getenv("TWITTER_URL", "https://twitter.com/elonmusk")
-SCROLL_TIMES = 3
+NITTER_URL = os.getenv("NITTER_URL", "https://nitter.net").rstrip("/")
+DC_CREATOR = "{http://purl.org/dc/elements/1.1/}creator"
 TTS_URL = "https://api.inworld.ai/tts/v1/voice:stream"
 VOICE_LIST_URL = "https://api.inworld.ai/tts/v1/voices"
 
 # ========================================
-# 🔀 Assign Voices to Users
+# 🔍 Fetch Tweets via Nitter RSS
 # ========================================
-def assign_voices(users, all_voices):
-    voice_map = {}
-    available = all_voices.copy()
-    random.shuffle(available)
-    for user in users:
-        if not available:
-            available = all_voices.copy()
-            random.shuffle(available)
-        voice_map[user] = available.pop()
-    return voice_map
-
+def _handle_from(target):
+    target = target.strip()
+    if "/" in target:
+        target = urlparse(target).path.strip("/").split("/")[0]
+    return target.lstrip("@")
 
-# ========================================
-# 🔍 Scrape Tweets (Your Method)
-# ========================================
-def scrape_tweets():
-    options = webdriver.ChromeOptions()
-    options.add_argument("--start-maximized")
-    driver = webdriver.Chrome(options=options)
 
-    print(f"🔗 Navigating to {TWITTER_URL}")
-    driver.get(TWITTER_URL)
-    time.sleep(5)
+def fetch_feed(session, handle):
+    """Return ``(user, tweet)`` pairs from a profile's Nitter RSS feed."""
+    response = session.get(f"{NITTER_URL}/{handle}/rss", timeout=30)
+    response.raise_for_status()
 
-    # Scroll to load tweets
-    for _ in range(SCROLL_TIMES):
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(2)
+    tweets = []
+    for item in ET.fromstring(response.content).iter("item"):
+        user = (item.findtext(DC_CREATOR) or f"@{handle}").strip()
+        tweet = html.unescape(item.findtext("title") or "").strip()
+        if tweet:
+            tweets.append((user, tweet))
+    return tweets
 
-    # Extract usernames and tweets from current DOM
-    tweet_elements = driver.find_elements(By.XPATH, '//article//div[@data-testid="tweetText"]')
-    user_elements = driver.find_elements(By.XPATH, '//article//div[@dir="ltr"]/span[contains(text(), "@")]')
 
-    tweets = []
-    for user_el, tweet_el in zip(user_elements, tweet_elements):
-        user = user_el.text.strip()
-        tweet = tweet_el.text.strip()
-        tweets.append((user, tweet))
+def scrape_tweets():
+    handles = [_handle_from(target) for target in TWITTER_URL.split(",") if target.strip()]
+    print(f"🔗 Fetching {', '.join('@' + h for h in handles)} from {NITTER_URL}")
 
-    driver.quit()
-    return tweets
+    # Plain HTTP + the C-accelerated XML parser: no browser, and feeds download in parallel.
+    with requests.Session() as session, ThreadPoolExecutor(max_workers=max(1, len(handles))) as pool:
+        feeds = pool.map(lambda handle: fetch_feed(session, handle), handles)
+        return [tweet for feed in feeds for tweet in feed]
 
 # ========================================
 # 🚀 Main Execution
 # ========================================
 def main():
     tweets = scrape_tweets()
-    users = list({user for user, _ in tweets})
+    all_voices = fetch_available_voices()
+    tweet_voices = [voice_for(user, all_voices) for user, _ in tweets]
 
-    all_voices = speak.fetch_available_voices()
-    voice_map = assign_voices(users, all_voices)
+    def announce(idx):
+        user, tweet = tweets[idx]
+        print(f"\n🎙️ {user} ({tweet_voices[idx]}): {tweet}")
 
-    for user, tweet in tweets:
-        voice = voice_map[user]
-        print(f"\n🎙️ {user} ({voice}): {tweet}")
-        speak.speak(f"{tweet}", voice)
+    # Clips for upcoming tweets are fetched while the current one plays.
+    speak_all(((tweet, voice) for (_, tweet), voice in zip(tweets, tweet_voices)), announce=announce)
 
 if __name__ == "__main__":
     main()
@@ -2,54 +2,229 @@
 
 from __future__ import annotations
 
+import asyncio
+import functools
+import os
 import random
-from typing import Dict, Optional, Set, Tuple
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
 
-from tts_voice import speak
+import tts_voice
 
 VOICE_ASSIGNMENTS: Dict[str, str] = {}
-_AVAILABLE_VOICES_CACHE: Optional[Set[str]] = None
+_AVAILABLE_VOICES_CACHE: Optional[FrozenSet[str]] = None
 _UNUSABLE_VOICES: Set[str] = set()
+# normalized agent id -> (agent id as first seen, voice id)
+_ASSIGNMENTS_BY_NORM: Dict[str, Tuple[str, str]] = {}
+# voice id -> normalized ids of the agents using it; keys are the assigned voices
+_VOICE_TO_AGENTS: Dict[str, Set[str]] = {}
+# Usable voices nobody holds, as a list for O(1) random pick plus an index for O(1) removal.
+_FREE_VOICES: List[str] = []
+_FREE_INDEX: Dict[str, int] = {}
 
-# Prefer consistent casing when looking up cached assignments.
+# Assignments and failed voices persist here, per provider, so agents keep their voice across runs.
+ASSIGNMENTS_DB = Path(
+    os.getenv("VOICE_ASSIGNMENTS_DB", "~/.cache/banter-agents/assignments.sqlite")
+).expanduser()
+# The provider is pinned at import: stored voice ids, synthesis and the voice list
+# all use it, even if tts_voice.set_provider() switches the package default later.
+_PROVIDER = tts_voice._provider_name
+speak = tts_voice._load_provider(_PROVIDER)
+# Persisted unusable voices are retried after this many seconds.
+UNUSABLE_VOICE_TTL = float(os.getenv("VOICE_UNUSABLE_TTL", str(7 * 86400)))
+_DB: Optional[sqlite3.Connection] = None
+_DB_LOADED = False
+# Guards the in-memory indexes above and the store connection. agent_server calls in
+# from request threads and the TTS pool at once; reentrant because helpers nest.
+_LOCK = threading.RLock()
+
+# Prefer consistent casing when looking up cached assignments. Interned so the
+# same agent maps to one string object across the indexes.
+@functools.lru_cache(maxsize=4096)
 def _normalize_agent(agent_id: str) -> str:
-    return agent_id.strip().lower()
+    return sys.intern(agent_id.strip().lower())
 
 
-def _load_available_voices(force: bool = False) -> Set[str]:
+def _load_available_voices(force: bool = False) -> FrozenSet[str]:
     global _AVAILABLE_VOICES_CACHE
-    if force or _AVAILABLE_VOICES_CACHE is None:
-        _AVAILABLE_VOICES_CACHE = set(speak.fetch_available_voices())
-    return _AVAILABLE_VOICES_CACHE
+    with _LOCK:
+        if force or _AVAILABLE_VOICES_CACHE is None:
+            _AVAILABLE_VOICES_CACHE = frozenset(tts_voice.fetch_available_voices(refresh=force, provider=_PROVIDER))
+            _FREE_VOICES.clear()
+            _FREE_INDEX.clear()
+            for voice_id in _AVAILABLE_VOICES_CACHE - _UNUSABLE_VOICES - _VOICE_TO_AGENTS.keys():
+                _free_add(voice_id)
+        return _AVAILABLE_VOICES_CACHE
 
 
-def _find_existing_assignment(agent_id: str) -> Tuple[Optional[str], Optional[str]]:
-    normalized = _normalize_agent(agent_id)
-    for key, voice in VOICE_ASSIGNMENTS.items():
-        if _normalize_agent(key) == normalized:
-            return key, voice
-    return None, None
+# The free-list helpers update _FREE_VOICES and _FREE_INDEX in separate steps,
+# so callers must hold _LOCK.
+def _free_add(voice_id: str) -> None:
+    if voice_id not in _FREE_INDEX:
+        _FREE_INDEX[voice_id] = len(_FREE_VOICES)
+        _FREE_VOICES.append(voice_id)
+
+
+def _free_remove(voice_id: str) -> None:
+    index = _FREE_INDEX.pop(voice_id, None)
+    if index is None:
+        return
+    last = _FREE_VOICES.pop()
+    if last != voice_id:  # swap the tail into the hole
+        _FREE_VOICES[index] = last
+        _FREE_INDEX[last] = index
+
+
+def _db() -> Optional[sqlite3.Connection]:
+    """Open the assignment store on first use and load its rows; None if it is unavailable."""
+    global _DB, _DB_LOADED
+    if _DB_LOADED:
+        return _DB
+    with _LOCK:
+        if _DB_LOADED:
+            return _DB
+        _DB_LOADED = True
+        try:
+            ASSIGNMENTS_DB.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(ASSIGNMENTS_DB), check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS assignments ("
+                "provider TEXT NOT NULL, agent_id_norm TEXT NOT NULL, agent_id TEXT NOT NULL, "
+                "voice_id TEXT NOT NULL, PRIMARY KEY (provider, agent_id_norm))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS unusable_voices ("
+                "provider TEXT NOT NULL, voice_id TEXT NOT NULL, failed_at REAL NOT NULL DEFAULT 0, "
+                "PRIMARY KEY (provider, voice_id))"
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(unusable_voices)")}
+            if "failed_at" not in columns:  # stores from before the TTL; their rows expire at once
+                conn.execute("ALTER TABLE unusable_voices ADD COLUMN failed_at REAL NOT NULL DEFAULT 0")
+            unusable = conn.execute(
+                "SELECT voice_id FROM unusable_voices WHERE provider = ? AND failed_at >= ?",
+                (_PROVIDER, time.time() - UNUSABLE_VOICE_TTL),
+            ).fetchall()
+            rows = conn.execute(
+                "SELECT agent_id_norm, agent_id, voice_id FROM assignments WHERE provider = ?",
+                (_PROVIDER,),
+            ).fetchall()
+        except (OSError, sqlite3.Error) as exc:
+            print(f"⚠️ Voice assignments will not persist ({exc}).")
+            return None
+        _UNUSABLE_VOICES.update(voice_id for (voice_id,) in unusable)
+        for normalized, agent_id, voice_id in rows:
+            _remember(normalized, agent_id, voice_id)
+        _DB = conn
+    return _DB
+
+
+def _execute(sql: str, params: Tuple[str, ...]) -> List[Tuple[str, ...]]:
+    conn = _db()
+    if conn is None:
+        return []
+    with _LOCK:
+        try:
+            return conn.execute(sql, params).fetchall()
+        except sqlite3.Error as exc:
+            print(f"⚠️ Voice assignment store error: {exc}")
+            return []
+
+
+def _remember(normalized: str, agent_id: str, voice_id: str) -> None:
+    # Caller holds _LOCK.
+    _ASSIGNMENTS_BY_NORM[normalized] = (agent_id, voice_id)
+    _VOICE_TO_AGENTS.setdefault(voice_id, set()).add(normalized)
+    VOICE_ASSIGNMENTS[agent_id] = voice_id
+    _free_remove(voice_id)
+
+
+def _claim(normalized: str, agent_id: str, voice_id: str) -> Tuple[str, str]:
+    """Store the assignment unless another process got there first; return the row that won.
+
+    Caller holds _LOCK.
+    """
+    conn = _db()
+    if conn is None:
+        return agent_id, voice_id
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR IGNORE INTO assignments (provider, agent_id_norm, agent_id, voice_id) "
+                "VALUES (?, ?, ?, ?)",
+                (_PROVIDER, normalized, agent_id, voice_id),
+            )
+            row = conn.execute(
+                "SELECT agent_id, voice_id FROM assignments WHERE provider = ? AND agent_id_norm = ?",
+                (_PROVIDER, normalized),
+            ).fetchone()
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+    except sqlite3.Error as exc:
+        print(f"⚠️ Voice assignment store error: {exc}")
+        return agent_id, voice_id
+    return row or (agent_id, voice_id)
+
+
+def _unassign(normalized: str) -> None:
+    with _LOCK:
+        _execute(
+            "DELETE FROM assignments WHERE provider = ? AND agent_id_norm = ?",
+            (_PROVIDER, normalized),
+        )
+        entry = _ASSIGNMENTS_BY_NORM.pop(normalized, None)
+        if entry is None:
+            return
+        agent_id, voice_id = entry
+        VOICE_ASSIGNMENTS.pop(agent_id, None)
+        agents = _VOICE_TO_AGENTS.get(voice_id)
+        if agents is not None:
+            agents.discard(normalized)
+            if not agents:
+                del _VOICE_TO_AGENTS[voice_id]
+                if voice_id in (_AVAILABLE_VOICES_CACHE or ()) and voice_id not in _UNUSABLE_VOICES:
+                    _free_add(voice_id)
 
 
 def get_or_assign_voice(agent_id: str) -> str:
     """Return an existing voice for the agent or assign a new one."""
-    existing_key, existing_voice = _find_existing_assignment(agent_id)
-    if existing_voice:
-        # Ensure assignment sticks with the original dictionary key.
-        if existing_key != agent_id:
-            VOICE_ASSIGNMENTS[agent_id] = existing_voice
-        return existing_voice
+    normalized = _normalize_agent(agent_id)
+    with _LOCK:
+        _db()
+        existing = _ASSIGNMENTS_BY_NORM.get(normalized)
+        if existing is not None:
+            return existing[1]
 
-    available = [voice for voice in _load_available_voices() if voice not in _UNUSABLE_VOICES]
-    if not available:
-        raise RuntimeError("No voices available from the active TTS provider.")
+        # Another process may have assigned this agent since we loaded the store.
+        stored = _execute(
+            "SELECT agent_id, voice_id FROM assignments WHERE provider = ? AND agent_id_norm = ?",
+            (_PROVIDER, normalized),
+        )
+        if stored:
+            _remember(normalized, *stored[0])
+            return stored[0][1]
 
-    assigned = {voice for voice in VOICE_ASSIGNMENTS.values()}
-    choices = [voice for voice in available if voice not in assigned]
-    voice_id = random.choice(choices or available)
+        available = _load_available_voices()
+        if _FREE_VOICES:
+            voice_id = _FREE_VOICES[random.randrange(len(_FREE_VOICES))]
+        else:
+            # Every usable voice is taken; share one.
+            usable = available - _UNUSABLE_VOICES
+            if not usable:
+                raise RuntimeError("No voices available from the active TTS provider.")
+            voice_id = random.choice(tuple(usable))
 
-    VOICE_ASSIGNMENTS[agent_id] = voice_id
-    return voice_id
+        stored_agent_id, voice_id = _claim(normalized, agent_id, voice_id)
+        _remember(normalized, stored_agent_id, voice_id)
+        return voice_id
 
 
 def speak_for_agent(agent_id: str, text: str) -> str:
@@ -62,6 +237,112 @@ def speak_for_agent(agent_id: str, text: str) -> str:
     return voice_id
 
 
+async def aspeak_for_agent(agent_id: str, text: str) -> str:
+    """Async twin of speak_for_agent; the request and playback run on the TTS pool."""
+    if not text:
+        raise ValueError("Text to speak must be non-empty.")
+
+    voice_id = get_or_assign_voice(agent_id)
+    await speak.aspeak(text, voice_id)
+    return voice_id
+
+
+async def speak_many(pairs: Iterable[Tuple[str, str]]) -> List[str]:
+    """Speak ``(agent_id, text)`` pairs in order and return the voices used.
+
+    All clips are synthesized concurrently (bounded by TTS_MAX_CONCURRENT), so
+    a broadcast waits for the slowest request rather than their sum; playback
+    stays sequential so lines never overlap.
+    """
+    pairs = list(pairs)
+    for _, text in pairs:
+        if not text:
+            raise ValueError("Text to speak must be non-empty.")
+
+    voices = [get_or_assign_voice(agent_id) for agent_id, _ in pairs]
+    paths = await asyncio.gather(
+        *(speak.asynthesize(text, voice_id) for (_, text), voice_id in zip(pairs, voices))
+    )
+    loop = asyncio.get_running_loop()
+    for path in paths:
+        await loop.run_in_executor(None, speak.play, path)
+    return voices
+
+
+# speak_for_agent_async collects lines for up to SPEECH_BATCH_WINDOW seconds (at
+# most SPEECH_BATCH_SIZE, Inworld's contexts per connection) and fetches them together.
+SPEECH_BATCH_SIZE = 5
+SPEECH_BATCH_WINDOW = 0.02
+
+
+class _SpeechBatcher:
+    """Queue of pending lines for one event loop, drained by a task that exits when idle."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+        self._queue: "asyncio.Queue[Tuple[str, str, asyncio.Future]]" = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    def submit(self, text: str, voice_id: str) -> asyncio.Future:
+        future = self.loop.create_future()
+        self._queue.put_nowait((text, voice_id, future))
+        if self._task is None or self._task.done():
+            self._task = self.loop.create_task(self._drain())
+        return future
+
+    async def _drain(self) -> None:
+        while not self._queue.empty():
+            batch = [self._queue.get_nowait()]
+            deadline = self.loop.time() + SPEECH_BATCH_WINDOW
+            while len(batch) < SPEECH_BATCH_SIZE:
+                timeout = deadline - self.loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._speak_batch(batch)
+
+    async def _speak_batch(self, batch: List[Tuple[str, str, asyncio.Future]]) -> None:
+        results = await asyncio.gather(
+            *(speak.asynthesize(text, voice_id) for text, voice_id, _ in batch),
+            return_exceptions=True,
+        )
+        # Playback stays in submission order so lines never overlap.
+        for (_, voice_id, future), result in zip(batch, results):
+            if not isinstance(result, BaseException):
+                try:
+                    await self.loop.run_in_executor(None, speak.play, result)
+                except Exception as exc:
+                    result = exc
+            if future.done():  # caller cancelled
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(voice_id)
+
+
+_BATCHER: Optional[_SpeechBatcher] = None
+
+
+def speak_for_agent_async(agent_id: str, text: str) -> asyncio.Future:
+    """Queue a line for the agent; the future resolves to the voice once it has played.
+
+    Lines queued close together are synthesized concurrently in small batches,
+    which suits crowds of agents talking at once. Must be called from a running loop.
+    """
+    global _BATCHER
+    if not text:
+        raise ValueError("Text to speak must be non-empty.")
+
+    loop = asyncio.get_running_loop()
+    if _BATCHER is None or _BATCHER.loop is not loop:
+        _BATCHER = _SpeechBatcher(loop)
+    return _BATCHER.submit(text, get_or_assign_voice(agent_id))
+
+
 def main() -> None:
     agent_id = input("Agent ID: ").strip()
     text = input("Text to speak: ").strip()
@@ -80,25 +361,51 @@ if __name__ == "__main__":
 
 def clear_voice_assignment(agent_id: str) -> None:
     """Remove any cached voice assignment for the given agent."""
-    normalized = _normalize_agent(agent_id)
-    for key in list(VOICE_ASSIGNMENTS.keys()):
-        if _normalize_agent(key) == normalized:
-            VOICE_ASSIGNMENTS.pop(key, None)
-            break
+    _unassign(_normalize_agent(agent_id))
+
+
+def mark_voice_unusable(voice_id: str, persist: bool = False) -> None:
+    """Remember a voice id that failed so we avoid reusing it.
+
+    Only this process forgets the voice unless ``persist`` is set, which callers
+    reserve for definitive provider rejections; persisted entries expire after
+    UNUSABLE_VOICE_TTL seconds.
+    """
+    with _LOCK:
+        if persist:
+            _execute(
+                "INSERT OR REPLACE INTO unusable_voices (provider, voice_id, failed_at) VALUES (?, ?, ?)",
+                (_PROVIDER, voice_id, time.time()),
+            )
+            _execute(
+                "DELETE FROM assignments WHERE provider = ? AND voice_id = ?",
+                (_PROVIDER, voice_id),
+            )
+        _UNUSABLE_VOICES.add(voice_id)
+        _free_remove(voice_id)
+        for normalized in _VOICE_TO_AGENTS.pop(voice_id, ()):
+            agent_id, _ = _ASSIGNMENTS_BY_NORM.pop(normalized)
+            VOICE_ASSIGNMENTS.pop(agent_id, None)
 
 
-def mark_voice_unusable(voice_id: str) -> None:
-    """Remember a voice id that failed so we avoid reusing it."""
-    _UNUSABLE_VOICES.add(voice_id)
-    for key, assigned in list(VOICE_ASSIGNMENTS.items()):
-        if assigned == voice_id:
-            VOICE_ASSIGNMENTS.pop(key, None)
+def reset_unusable_voices() -> None:
+    """Make every voice marked unusable eligible again, in memory and in the store."""
+    with _LOCK:
+        _execute("DELETE FROM unusable_voices WHERE provider = ?", (_PROVIDER,))
+        freed = _UNUSABLE_VOICES - _VOICE_TO_AGENTS.keys()
+        _UNUSABLE_VOICES.clear()
+        for voice_id in freed & (_AVAILABLE_VOICES_CACHE or frozenset()):
+            _free_add(voice_id)
 
 
 __all__ = [
+    "aspeak_for_agent",
     "get_or_assign_voice",
+    "speak_many",
     "speak_for_agent",
+    "speak_for_agent_async",
     "VOICE_ASSIGNMENTS",
     "clear_voice_assignment",
     "mark_voice_unusable",
+    "reset_unusable_voices",
 ]
@@ -1,31 +1,170 @@
 """Provider-agnostic TTS helpers."""
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from importlib import import_module
+from pathlib import Path
+import functools
+import json
+import logging
 import os
+import time
+import zlib
 
+# No provider module may be called ``speak``: importing it would rebind the
+# package's ``speak`` alias below to that module, whichever provider is active.
 _PROVIDER_MODULES = {
-    "inworld": "tts_voice.speak",
+    "inworld": "tts_voice.inworld",
     "elevenlabs": "tts_voice.elevenlabs",
 }
 
 
-def _load_provider():
-    provider = os.getenv("TTS_PROVIDER", "elevenlabs").lower()
+# Provider diagnostics go to the "tts_voice" logger; TTS_LOG_LEVEL=INFO or DEBUG shows them.
+logger = logging.getLogger("tts_voice")
+_LOG_LEVEL = os.getenv("TTS_LOG_LEVEL", "").strip().upper()
+if _LOG_LEVEL:
+    logger.setLevel(_LOG_LEVEL)
+    if not logger.handlers:
+        _handler = logging.StreamHandler()
+        _handler.setFormatter(logging.Formatter("[tts] %(levelname)s %(message)s"))
+        logger.addHandler(_handler)
+        logger.propagate = False
+
+VOICES_TTL = int(os.getenv("TTS_VOICES_TTL", "86400"))  # 0 disables the cache
+VOICE_CACHE_DIR = Path("~/.cache/banter-agents").expanduser()
+
+
+_LOADED = {}
+
+
+def _load_provider(provider):
+    module = _LOADED.get(provider)
+    if module is not None:
+        return module
     module_path = _PROVIDER_MODULES.get(provider)
     if not module_path:
         raise ValueError(
             f"Unsupported TTS_PROVIDER '{provider}'. "
             f"Available options: {', '.join(_PROVIDER_MODULES)}."
         )
-    return import_module(module_path)
+    module = _LOADED[provider] = import_module(module_path)
+    return module
+
+
+def set_provider(name):
+    """Switch the backend used by this package's helpers; each module is imported once."""
+    global _provider_name, _provider, speak_text, speak
+    name = name.lower()
+    _provider = _load_provider(name)
+    _provider_name = name
+    speak_text = _provider.speak
+    # Expose provider module so existing imports `from tts_voice import speak`
+    # continue to work regardless of which backend is active.
+    speak = _provider
+
+
+set_provider(os.getenv("TTS_PROVIDER", "elevenlabs"))
+
+
+def fetch_available_voices(refresh=False, provider=None):
+    """Return a provider's voice IDs, cached in memory and on disk for VOICES_TTL seconds.
+
+    ``provider`` defaults to the active one; callers that pinned a provider pass
+    its name so a later set_provider() does not change their voice list.
+    ``refresh=True`` drops both caches and refetches from the provider.
+    """
+    provider = (provider or _provider_name).lower()
+    module = _load_provider(provider)
+    if VOICES_TTL <= 0:
+        return list(module.fetch_available_voices())
+    if refresh:
+        _cached_voices.cache_clear()
+        # Providers that keep their own in-process catalogue expose a reset hook.
+        clear_provider_cache = getattr(module, "clear_voice_cache", None)
+        if clear_provider_cache is not None:
+            clear_provider_cache()
+        try:
+            os.remove(_voices_cache_path(provider))
+        except OSError:
+            pass
+    # The gender filter changes which voices ElevenLabs returns, so it is part of the key.
+    variant = os.getenv("ELEVENLABS_VOICE_GENDER", "").strip().lower()
+    return list(_cached_voices(provider, variant, int(time.time() // VOICES_TTL)))
+
+
+def _voices_cache_path(provider):
+    return VOICE_CACHE_DIR / f"voices-{provider}.json"
+
+
+@functools.lru_cache(maxsize=len(_PROVIDER_MODULES))
+def _cached_voices(provider, variant, bucket):
+    path = _voices_cache_path(provider)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached["variant"] == variant and time.time() - cached["ts"] < VOICES_TTL:
+            return tuple(cached["voices"])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    voices = tuple(_load_provider(provider).fetch_available_voices())
+    try:
+        VOICE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"ts": time.time(), "variant": variant, "voices": list(voices)}, f)
+    except OSError:
+        pass
+    return voices
+
+
+def voice_for(name, voices):
+    """Pick a voice for ``name`` from a stable hash, so a user keeps their voice across runs.
+
+    crc32 rather than ``hash()``, which is salted per process.
+    """
+    return voices[zlib.crc32(name.encode("utf-8")) % len(voices)]
+
+
+def speak_all(lines, *, prefetch=4, announce=None, on_error=None):
+    """Speak ``(text, voice_id)`` pairs in order, synthesizing upcoming clips during playback.
+
+    Up to ``prefetch`` requests run ahead of the clip that is playing, so API
+    latency hides behind audio; repeated lines are served from the provider's
+    on-disk cache. ``announce(idx)`` runs just before line ``idx`` plays;
+    ``on_error(idx, exc)`` handles a failed line (errors raise without it).
+    """
+    lines = list(lines)
+    upcoming = iter(range(len(lines)))
+    pending = deque()
+
+    with ThreadPoolExecutor(max_workers=prefetch, thread_name_prefix="tts") as pool:
 
+        def schedule_next():
+            idx = next(upcoming, None)
+            if idx is not None:
+                text, voice_id = lines[idx]
+                pending.append((idx, pool.submit(_provider.synthesize, text, voice_id)))
 
-_provider = _load_provider()
-fetch_available_voices = _provider.fetch_available_voices
-speak_text = getattr(_provider, "speak")
+        for _ in range(prefetch):
+            schedule_next()
+        while pending:
+            idx, future = pending.popleft()
+            schedule_next()
+            if announce is not None:
+                announce(idx)
+            try:
+                _provider.play(future.result())
+            except Exception as exc:
+                if on_error is None:
+                    raise
+                on_error(idx, exc)
 
-# Expose provider module so existing imports `from tts_voice import speak`
-# continue to work regardless of which backend is active.
-speak = _provider
 
-__all__ = ["fetch_available_voices", "speak", "speak_text"]
+__all__ = [
+    "fetch_available_voices",
+    "set_provider",
+    "speak",
+    "speak_all",
+    "speak_text",
+    "voice_for",
+]
@@ -0,0 +1,101 @@
+"""Content-addressed on-disk cache for synthesized speech."""
+
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+# Set TTS_CACHE_DIR to an empty string to disable caching.
+_CACHE_DIR_ENV = os.getenv("TTS_CACHE_DIR", "~/.cache/banter-agents/tts")
+CACHE_DIR = Path(_CACHE_DIR_ENV).expanduser() if _CACHE_DIR_ENV else None
+MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+# A sweep trims down to this, leaving headroom so the next writes don't sweep again.
+_LOW_WATER = MAX_BYTES * 9 // 10
+
+# Running estimate of the cache size, so writes only sweep the directory when it
+# looks full. None until the first write; each sweep resets it from disk.
+_size = None
+_size_lock = threading.Lock()
+
+
+def enabled():
+    return CACHE_DIR is not None
+
+
+def cache_path(key):
+    """Path of the clip for ``key`` (provider, voice, model, settings, text, ...)."""
+    digest = hashlib.sha256(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()
+    return CACHE_DIR / f"{digest}.wav"
+
+
+def lookup(path):
+    """Return True if ``path`` is cached, marking it as recently used for eviction."""
+    try:
+        os.utime(path)
+        return True
+    except OSError:
+        return False
+
+
+@contextmanager
+def writing(path):
+    """Yield a binary file that atomically becomes ``path`` once the block succeeds.
+
+    Concurrent writers each get their own temp file, so a reader never sees a
+    partial clip; the last rename wins and both contents are identical anyway.
+    """
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+    try:
+        with open(tmp, "wb", buffering=1 << 20) as f:
+            yield f
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    _account(path)
+
+
+def _account(path):
+    global _size
+    try:
+        added = os.path.getsize(path)
+    except OSError:
+        added = 0
+    with _size_lock:
+        if _size is not None and _size + added <= MAX_BYTES:
+            _size += added
+            return
+        _size = evict()
+
+
+def evict():
+    """Drop least recently used clips once the cache outgrows MAX_BYTES; return the bytes left."""
+    entries = []
+    total = 0
+    with os.scandir(CACHE_DIR) as it:
+        for entry in it:
+            if not entry.name.endswith(".wav"):
+                continue  # in-flight temp files
+            try:
+                stat = entry.stat()
+            except OSError:  # removed by a concurrent sweep
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+    if total <= MAX_BYTES:
+        return total
+    for _, size, entry_path in sorted(entries):
+        try:
+            os.remove(entry_path)
+        except OSError:
+            continue
+        total -= size
+        if total <= _LOW_WATER:
+            break
+    return total
@@ -0,0 +1,27 @@
+"""Shared HTTP plumbing for the TTS providers."""
+
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Inworld allows 20 concurrent streams per key; stay under it by default.
+MAX_CONCURRENT = int(os.getenv("TTS_MAX_CONCURRENT", "20"))
+
+_EXECUTOR = ThreadPoolExecutor(max_workers=MAX_CONCURRENT, thread_name_prefix="tts-http")
+
+
+def new_session():
+    """A keep-alive session whose pool can hold a connection per concurrent request."""
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=MAX_CONCURRENT))
+    return session
+
+
+async def run_async(func, *args, **kwargs):
+    """Run a blocking provider call on the TTS pool, at most MAX_CONCURRENT at a time."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_EXECUTOR, functools.partial(func, *args, **kwargs))
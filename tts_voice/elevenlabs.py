@@ -2,23 +2,52 @@
 
 from __future__ import annotations
 
+import functools
+import itertools
+import logging
 import os
 import platform
+import shutil
 import subprocess
-import uuid
+import time
+from collections import defaultdict
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 import requests
 from dotenv import load_dotenv
 
+from tts_voice import _cache, _http
+
 load_dotenv()
 
 BASE_URL = "https://api.elevenlabs.io/v1"
 DEFAULT_MODEL_ID = "eleven_v3"
 DEFAULT_OUTPUT_DIR = Path("tts_output")
-
-
+# Output names only need to be unique, not random: start time + pid + a counter.
+_RUN_ID = f"{int(time.time())}_{os.getpid()}"
+_FILE_COUNTER = itertools.count()
+CHUNK_SIZE = 64 * 1024
+# Smaller reads while feeding a live player, so the first sound is not held back.
+PIPE_CHUNK_SIZE = 16 * 1024
+WRITE_BUFFER = 1 << 20
+# Plays audio from stdin, so playback starts with the first chunk.
+PIPE_PLAYER = ("ffplay", "-nodisp", "-autoexit", "-loglevel", "quiet", "-i", "pipe:0")
+
+_SESSION = _http.new_session()
+
+_SYSTEM = platform.system()
+# Playback binaries are resolved once; Windows goes through PowerShell's Start-Process.
+_POWERSHELL = shutil.which("powershell") or "powershell"
+_PLAYER = {
+    "Darwin": shutil.which("afplay") or "/usr/bin/afplay",
+    "Windows": None,
+}.get(_SYSTEM, shutil.which("aplay") or "aplay")
+
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=None)  # a missing key raises, so it is not cached
 def _get_api_key() -> str:
     api_key = os.getenv("ELEVENLABS_API_KEY")
     if not api_key:
@@ -28,56 +57,67 @@ def _get_api_key() -> str:
     return api_key
 
 
-def fetch_available_voices() -> List[str]:
-    """Return a list of available ElevenLabs voice IDs (male voices by default)."""
+def _voice_gender(entry: Dict[str, object]) -> str:
+    direct = str(entry.get("gender", "") or "").lower()
+    if direct:
+        return direct
+    labels = entry.get("labels")
+    if isinstance(labels, dict):
+        return str(labels.get("gender", "") or "").lower()
+    return ""
+
+
+@functools.lru_cache(maxsize=1)
+def _voice_index() -> Tuple[Tuple[str, ...], Dict[str, Tuple[str, ...]]]:
+    """Fetch the catalogue once: every voice id, plus the ids bucketed by gender."""
     headers = {"xi-api-key": _get_api_key()}
-    response = requests.get(f"{BASE_URL}/voices", headers=headers, timeout=30)
+    response = _SESSION.get(f"{BASE_URL}/voices", headers=headers, timeout=30)
     response.raise_for_status()
 
-    data = response.json()
-    voices = data.get("voices", [])
-    print("🔍 ElevenLabs voice response example:")
-    if voices:
+    voices = response.json().get("voices", [])
+    if voices and logger.isEnabledFor(logging.DEBUG):
         sample = {k: voices[0].get(k) for k in ("voice_id", "name", "category", "gender")}
-        print(sample)
-    preferred_gender = os.getenv("ELEVENLABS_VOICE_GENDER", "").strip().lower()
-
-    def _voice_gender(entry: Dict[str, object]) -> str:
-        direct = str(entry.get("gender", "") or "").lower()
-        if direct:
-            return direct
-        labels = entry.get("labels")
-        if isinstance(labels, dict):
-            label_gender = str(labels.get("gender", "") or "").lower()
-            if label_gender:
-                return label_gender
-        return ""
-
-    matching: List[str] = []
-    fallback: List[str] = []
+        logger.debug("ElevenLabs voice response example: %s", sample)
+
+    all_ids: List[str] = []
+    buckets: Dict[str, List[str]] = defaultdict(list)
     for voice in voices:
         voice_id = voice.get("voice_id")
-        if not voice_id:
-            continue
-        gender = _voice_gender(voice)
-        if preferred_gender and gender:
-            if gender == preferred_gender:
-                matching.append(voice_id)
-                continue
-        fallback.append(voice_id)
+        if voice_id:
+            all_ids.append(voice_id)
+            buckets[_voice_gender(voice)].append(voice_id)
+    return tuple(all_ids), {gender: tuple(ids) for gender, ids in buckets.items()}
 
-    if preferred_gender:
-        if matching:
-            result = matching
-            print(f"✅ Loaded {len(result)} voices matching gender='{preferred_gender}'.")
-        else:
-            result = fallback
-            print(
-                f"⚠️ No voices matched gender='{preferred_gender}'. Falling back to {len(result)} available voices."
-            )
+
+def clear_voice_cache() -> None:
+    """Forget the catalogue so the next fetch_available_voices() refetches it."""
+    _voice_index.cache_clear()
+
+
+def fetch_available_voices(preferred_gender: Optional[str] = None) -> List[str]:
+    """Return available ElevenLabs voice IDs, filtered by gender when one is preferred.
+
+    ``preferred_gender`` defaults to ELEVENLABS_VOICE_GENDER. The catalogue is
+    fetched once per process, so switching genders is a dict lookup.
+    """
+    if preferred_gender is None:
+        preferred_gender = os.getenv("ELEVENLABS_VOICE_GENDER", "")
+    preferred_gender = preferred_gender.strip().lower()
+    all_ids, by_gender = _voice_index()
+
+    result = list(by_gender.get(preferred_gender, ())) if preferred_gender else []
+    if result:
+        logger.info("Loaded %d voices matching gender=%r.", len(result), preferred_gender)
     else:
-        result = matching + fallback
-        print(f"✅ Loaded {len(result)} voices (no gender filter).")
+        result = list(all_ids)
+        if preferred_gender:
+            logger.warning(
+                "No voices matched gender=%r. Falling back to %d available voices.",
+                preferred_gender,
+                len(result),
+            )
+        else:
+            logger.info("Loaded %d voices (no gender filter).", len(result))
 
     if not result:
         raise RuntimeError("No ElevenLabs voices available after filtering.")
@@ -96,7 +136,8 @@ def speak(
 ) -> Path:
     """Generate speech with ElevenLabs and optionally play it.
 
-    Returns the path to the generated audio file.
+    Repeated (voice, model, settings, text) requests are served from the on-disk
+    cache without calling the API. Returns the path to the audio file.
     """
 
     if not text:
@@ -110,6 +151,50 @@ def speak(
         "use_speaker_boost": True,
     }
 
+    played = False
+    cached = None
+    if _cache.enabled():
+        cached = _cache.cache_path({
+            "provider": "elevenlabs",
+            "voice_id": voice_id,
+            "model_id": model_id,
+            "voice_settings": voice_settings,
+            "text": text,
+        })
+        if not _cache.lookup(cached):
+            response = _request_speech(text, voice_id, model_id, voice_settings)
+            with _cache.writing(cached) as audio_file:
+                played = _write_audio(response, audio_file, play=play_audio)
+
+    if output_path:
+        output_path = Path(output_path)
+
+    if cached is not None and not output_path:
+        file_path = cached
+    else:
+        output_dir = output_path.parent if output_path else DEFAULT_OUTPUT_DIR
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        filename = output_path.name if output_path else f"elevenlabs_{voice_id}_{_RUN_ID}_{next(_FILE_COUNTER)}.wav"
+        file_path = output_dir / filename
+
+        if cached is not None:
+            shutil.copyfile(cached, file_path)
+        else:
+            response = _request_speech(text, voice_id, model_id, voice_settings)
+            with open(file_path, "wb", buffering=WRITE_BUFFER) as audio_file:
+                played = _write_audio(response, audio_file, play=play_audio)
+
+    if play_audio and not played:
+        _play_audio(file_path)
+
+    return file_path
+
+
+def _request_speech(
+    text: str, voice_id: str, model_id: str, voice_settings: Dict[str, float]
+) -> requests.Response:
     headers = {
         "xi-api-key": _get_api_key(),
         "Accept": "audio/wav",
@@ -123,43 +208,89 @@ def speak(
     }
 
     url = f"{BASE_URL}/text-to-speech/{voice_id}"
-    response = requests.post(url, json=payload, headers=headers, stream=True, timeout=120)
+    response = _SESSION.post(url, json=payload, headers=headers, stream=True, timeout=120)
     response.raise_for_status()
+    return response
 
-    if output_path:
-        output_path = Path(output_path)
 
-    output_dir = output_path.parent if output_path else DEFAULT_OUTPUT_DIR
-    output_dir = Path(output_dir)
-    output_dir.mkdir(parents=True, exist_ok=True)
+def _write_audio(response: requests.Response, audio_file, play: bool = False) -> bool:
+    """Write the response body to ``audio_file``, also piping it to ffplay when ``play``.
 
-    filename = output_path.name if output_path else f"elevenlabs_{voice_id}_{uuid.uuid4().hex}.wav"
-    file_path = output_dir / filename
+    Returns True if the audio was played. Without ffplay, or if it fails, the
+    caller plays the finished file; a player error never discards the download.
+    """
+    player = _open_pipe_player() if play else None
+    feeding = player is not None
+    try:
+        chunk_size = PIPE_CHUNK_SIZE if feeding else CHUNK_SIZE
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            if not chunk:
+                continue
+            audio_file.write(chunk)
+            if feeding:
+                try:
+                    player.stdin.write(chunk)
+                except BrokenPipeError:  # player closed early; keep saving the file
+                    feeding = False
+    except BaseException:
+        if player is not None:
+            player.kill()
+            player.wait()
+        raise
 
-    with open(file_path, "wb") as audio_file:
-        for chunk in response.iter_content(chunk_size=4096):
-            if chunk:
-                audio_file.write(chunk)
+    if player is None:
+        return False
+    try:
+        player.stdin.close()
+    except BrokenPipeError:
+        pass
+    if player.wait() != 0:
+        logger.warning("ffplay exited with %d; playing the saved file instead.", player.returncode)
+        return False
+    return True
 
-    if play_audio:
-        _play_audio(file_path)
 
-    return file_path
+def _open_pipe_player() -> Optional[subprocess.Popen]:
+    if shutil.which(PIPE_PLAYER[0]) is None:
+        return None
+    return subprocess.Popen(PIPE_PLAYER, stdin=subprocess.PIPE)
+
+
+def synthesize(text: str, voice_id: str, **kwargs) -> Path:
+    """Fetch speech for ``text`` into a file without playing it; returns the path."""
+    return speak(text, voice_id, play_audio=False, **kwargs)
+
+
+def play(file_path: Path) -> None:
+    _play_audio(Path(file_path))
+
+
+async def asynthesize(text: str, voice_id: str, **kwargs) -> Path:
+    return await _http.run_async(synthesize, text, voice_id, **kwargs)
+
+
+async def aspeak(text: str, voice_id: str, **kwargs) -> Path:
+    return await _http.run_async(speak, text, voice_id, **kwargs)
 
 
 def _play_audio(file_path: Path) -> None:
-    system = platform.system()
-    if system == "Darwin":
-        subprocess.run(["afplay", str(file_path)], check=True)
-    elif system == "Windows":
+    if _PLAYER is None:
         command = [
-            "powershell",
+            _POWERSHELL,
             "-Command",
             f"Start-Process -FilePath 'wmplayer' -ArgumentList '{file_path}' -Wait",
         ]
-        subprocess.run(command, check=True)
     else:
-        subprocess.run(["aplay", str(file_path)], check=True)
-
-
-__all__ = ["fetch_available_voices", "speak"]
+        command = [_PLAYER, str(file_path)]
+    subprocess.run(command, check=True)
+
+
+__all__ = [
+    "aspeak",
+    "asynthesize",
+    "clear_voice_cache",
+    "fetch_available_voices",
+    "play",
+    "speak",
+    "synthesize",
+]
@@ -0,0 +1,205 @@
+"""Text-to-speech helpers for Inworld."""
+
+import os
+import json
+import itertools
+import wave
+import binascii
+import logging
+import platform
+import shutil
+import subprocess
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+try:  # orjson is optional; it decodes the streamed audio chunks faster than json.
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - falls back to the stdlib codec.
+    orjson = None
+
+from tts_voice import _cache, _http
+
+load_dotenv()
+
+
+API_KEY = os.getenv("INWORLD_API_TOKEN")
+TTS_URL = "https://api.inworld.ai/tts/v1/voice:stream"
+VOICE_LIST_URL = "https://api.inworld.ai/tts/v1/voices"
+MODEL_ID = "inworld-tts-1"
+CHUNK_SIZE = 64 * 1024
+DEFAULT_OUTPUT_DIR = Path("tts_output")
+# Output names only need to be unique, not random: start time + pid + a counter.
+_RUN_ID = f"{int(time.time())}_{os.getpid()}"
+_FILE_COUNTER = itertools.count()
+_loads = orjson.loads if orjson is not None else json.loads
+
+_SESSION = _http.new_session()
+
+_SYSTEM = platform.system()
+# Playback binaries are resolved once; Windows goes through PowerShell's Start-Process.
+_POWERSHELL = shutil.which("powershell") or "powershell"
+_PLAYER = {
+    "Darwin": shutil.which("afplay") or "/usr/bin/afplay",
+    "Windows": None,
+}.get(_SYSTEM, shutil.which("aplay") or "aplay")
+
+logger = logging.getLogger(__name__)
+
+
+# ========================================
+# 🎤 Fetch All Voices Once
+# ========================================
+def fetch_available_voices():
+    headers = {
+        "Authorization": f"Basic {API_KEY}",
+    }
+    res = _SESSION.get(VOICE_LIST_URL, headers=headers)
+    res.raise_for_status()
+
+    data = res.json()
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Inworld voice response: %s", json.dumps(data, indent=2))
+    voices = [v["voiceId"] for v in data["voices"]]
+    logger.info("Loaded %d voices.", len(voices))
+    return voices
+
+
+# ========================================
+# 🗣️ Speak Tweet with Inworld
+# ========================================
+def speak_with_inworld(text, voice_id, sample_rate=48000):
+    output_path = None if _cache.enabled() else "output.wav"
+    path = synthesize(text, voice_id, sample_rate=sample_rate, output_path=output_path)
+    _play_audio(str(path))
+
+
+def synthesize(text, voice_id, sample_rate=48000, output_path=None):
+    """Fetch speech for ``text`` into a WAV file without playing it; returns the path.
+
+    Repeated (voice, sample rate, text) requests reuse the on-disk cache.
+    """
+    cached = None
+    if _cache.enabled():
+        cached = _cache.cache_path({
+            "provider": "inworld",
+            "voice_id": voice_id,
+            "model_id": MODEL_ID,
+            "sample_rate": sample_rate,
+            "text": text,
+        })
+        if not _cache.lookup(cached):
+            response = _request_speech(text, voice_id, sample_rate)
+            with _cache.writing(cached) as f:
+                _write_wav(f, response, sample_rate)
+        if output_path is None:
+            return cached
+
+    if output_path is None:
+        DEFAULT_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+        output_path = DEFAULT_OUTPUT_DIR / f"inworld_{voice_id}_{_RUN_ID}_{next(_FILE_COUNTER)}.wav"
+    output_path = Path(output_path)
+
+    if cached is not None:
+        shutil.copyfile(cached, output_path)
+    else:
+        response = _request_speech(text, voice_id, sample_rate)
+        with open(output_path, "wb", buffering=1 << 20) as f:
+            _write_wav(f, response, sample_rate)
+    return output_path
+
+
+def _request_speech(text, voice_id, sample_rate):
+    headers = {
+        "Authorization": f"Basic {API_KEY}",
+        "Content-Type": "application/json"
+    }
+    payload = {
+        "text": text,
+        "voiceId": voice_id,
+        "modelId": MODEL_ID,
+        "audio_config": {
+            "audio_encoding": "LINEAR16",
+            "sample_rate_hertz": sample_rate,
+        }
+    }
+
+    response = _SESSION.post(TTS_URL, json=payload, headers=headers, stream=True)
+    response.raise_for_status()
+    return response
+
+
+def _write_wav(f, response, sample_rate):
+    """Append each streamed chunk's PCM to one WAV; ``wave`` patches the sizes on close."""
+    with wave.open(f, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        for line in _iter_lines(response):
+            if line:
+                chunk = _loads(line)
+                # a2b_base64 is what b64decode wraps; the view skips copying the PCM again.
+                audio_chunk = binascii.a2b_base64(chunk["result"]["audioContent"])
+                if len(audio_chunk) > 44:
+                    wf.writeframesraw(memoryview(audio_chunk)[44:])  # Strip header
+
+
+def _iter_lines(response):
+    """Yield the stream's newline-delimited records.
+
+    ``iter_lines`` re-concatenates the pending partial line on every 512-byte
+    read, which is quadratic in the size of one base64 audio record; this
+    appends reads to one bytearray and drops consumed lines in place.
+    """
+    buf = bytearray()
+    for data in response.iter_content(chunk_size=CHUNK_SIZE):
+        buf += data
+        start = 0
+        end = buf.find(b"\n")
+        while end >= 0:
+            yield buf[start:end].strip()
+            start = end + 1
+            end = buf.find(b"\n", start)
+        del buf[:start]
+    yield buf.strip()
+
+
+def _play_audio(file_path: str) -> None:
+    if _PLAYER is None:
+        command = [
+            _POWERSHELL,
+            "-Command",
+            f"Start-Process -FilePath 'wmplayer' -ArgumentList '{file_path}' -Wait",
+        ]
+    else:
+        command = [_PLAYER, str(file_path)]
+    subprocess.run(command, check=True)
+
+
+def speak(text, voice_id, sample_rate=48000):
+    """Compatibility wrapper so call sites can invoke provider.speak()."""
+    return speak_with_inworld(text, voice_id, sample_rate=sample_rate)
+
+
+def play(file_path) -> None:
+    _play_audio(str(file_path))
+
+
+async def asynthesize(text, voice_id, sample_rate=48000, output_path=None):
+    return await _http.run_async(synthesize, text, voice_id, sample_rate=sample_rate, output_path=output_path)
+
+
+async def aspeak(text, voice_id, sample_rate=48000):
+    return await _http.run_async(speak, text, voice_id, sample_rate=sample_rate)
+
+
+__all__ = [
+    "aspeak",
+    "asynthesize",
+    "fetch_available_voices",
+    "play",
+    "speak",
+    "speak_with_inworld",
+    "synthesize",
+]